@@ -9,6 +9,7 @@ Env vars:
 - MILVUS_PORT (default: 19530)
 - GOOGLE_API_KEY or GEMINI_API_KEY (required for embeddings)
 - GEMINI_EMBED_MODEL (default: gemini-embedding-001)
+- EMBED_CACHE_PATH (default: .cache/embeddings.sqlite; set to empty to disable the embedding cache)
 
 Usage examples:
 - Index only from a Markdown file and show first 5 rows:
@@ -21,22 +22,52 @@ Usage examples:
 
 from __future__ import annotations
 
+import asyncio
 import os
+import queue
+import random
+import sqlite3
 import sys
 import re
+import threading
+from collections import OrderedDict, deque
 from dataclasses import dataclass
 import hashlib
+import json
+import mmap
 from pathlib import Path
-from typing import List, Tuple, Any, Iterable
+from typing import Dict, List, Tuple, Any, Iterable, Iterator
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
+try:
+	import numpy as np
+except Exception:  # pragma: no cover
+	np = None
+
+try:
+	import ml_dtypes  # bfloat16 numpy dtype (only needed for --vector-dtype bf16)
+except Exception:  # pragma: no cover
+	ml_dtypes = None
+
+try:
+	import simsimd  # SIMD cosine kernels for client-side rescoring (optional)
+except Exception:  # pragma: no cover
+	simsimd = None
+
+try:
+	import faiss  # exact GPU search for large collections (optional, needs a CUDA build)
+except Exception:  # pragma: no cover
+	faiss = None
+
 try:
 	from google import genai
+	from google.genai import types as genai_types
 except Exception:  # pragma: no cover
 	genai = None
+	genai_types = None
 
 try:
 	from pymilvus import (
@@ -56,6 +87,14 @@ except Exception:  # pragma: no cover
 	Collection = None
 
 
+# Native output size of known embedding models; lets demo() skip the probe call
+MODEL_DIMS: Dict[str, int] = {
+	"gemini-embedding-001": 3072,
+	"text-embedding-004": 768,
+	"embedding-001": 768,
+}
+
+
 def get_genai_client():
 	if genai is None:
 		raise RuntimeError("google-genai SDK not installed; run 'uv add google-genai'.")
@@ -65,81 +104,308 @@ def get_genai_client():
 	return genai.Client(api_key=api_key)
 
 
-def embed_texts(texts: List[str], model: str, batch_size: int = 64) -> List[List[float]]:
-	"""Return embeddings for a list of texts using Gemini embeddings, batched.
+class EmbeddingCache:
+	"""Embedding cache keyed by (model, sha256(text)).
 
-	Falls back to per-item on unexpected batch errors.
+	An in-process LRU sits in front of a SQLite file so repeated texts (queries,
+	re-indexed chunks) skip the embedding API both within and across runs.
+	Vectors are stored and returned as float32 arrays.
+	"""
+
+	def __init__(self, path: Path | str, mem_size: int = 4096):
+		self.path = Path(path)
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+		self._db.execute("CREATE TABLE IF NOT EXISTS emb (k BLOB PRIMARY KEY, v BLOB NOT NULL)")
+		self._db.commit()
+		self._mem: OrderedDict[bytes, Any] = OrderedDict()
+		self._mem_size = mem_size
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def key(model_id: str, text: str) -> bytes:
+		return hashlib.sha256(f"{model_id}\x00{text}".encode("utf-8")).digest()
+
+	def _remember(self, k: bytes, vec: Any):
+		self._mem[k] = vec
+		self._mem.move_to_end(k)
+		if len(self._mem) > self._mem_size:
+			self._mem.popitem(last=False)
+
+	def get_many(self, model_id: str, texts: List[str]) -> Tuple[Dict[int, Any], List[Tuple[int, str]]]:
+		"""Return (hits by position, misses as (position, text))."""
+		keys = [self.key(model_id, t) for t in texts]
+		hits: Dict[int, Any] = {}
+		pending: Dict[bytes, List[int]] = {}
+		with self._lock:
+			for i, k in enumerate(keys):
+				vec = self._mem.get(k)
+				if vec is not None:
+					self._mem.move_to_end(k)
+					hits[i] = vec
+				else:
+					pending.setdefault(k, []).append(i)
+			if pending:
+				ks = list(pending)
+				for j in range(0, len(ks), 500):
+					part = ks[j : j + 500]
+					q = f"SELECT k, v FROM emb WHERE k IN ({','.join('?' * len(part))})"
+					for k, v in self._db.execute(q, part):
+						vec = np.frombuffer(v, dtype=np.float32)
+						self._remember(k, vec)
+						for i in pending.pop(k):
+							hits[i] = vec
+		misses = sorted((i, texts[i]) for idxs in pending.values() for i in idxs)
+		return hits, misses
+
+	def put_many(self, model_id: str, items: Iterable[Tuple[str, Any]]):
+		rows = []
+		with self._lock:
+			for text, vec in items:
+				k = self.key(model_id, text)
+				vec = np.array(vec, dtype=np.float32)
+				self._remember(k, vec)
+				rows.append((k, vec.tobytes()))
+			if rows:
+				self._db.executemany("INSERT OR REPLACE INTO emb (k, v) VALUES (?, ?)", rows)
+				self._db.commit()
+
+
+_EMBED_CACHE: EmbeddingCache | None = None
+
+
+def _get_embed_cache() -> EmbeddingCache | None:
+	global _EMBED_CACHE
+	path = os.getenv("EMBED_CACHE_PATH", ".cache/embeddings.sqlite")
+	if not path:
+		return None
+	if _EMBED_CACHE is None:
+		try:
+			_EMBED_CACHE = EmbeddingCache(path)
+		except Exception as e:
+			print(f"WARN: Embedding cache disabled ({path}): {e}")
+			os.environ["EMBED_CACHE_PATH"] = ""
+			return None
+	return _EMBED_CACHE
+
+
+async def _embed_async(
+	texts: List[str],
+	model_id: str,
+	batch_size: int,
+	max_concurrency: int = 5,
+	output_dim: int | None = None,
+) -> Any:
+	"""Embed texts with up to ``max_concurrency`` batch requests in flight.
+
+	Returns a float32 array of shape (len(texts), dim); each batch is converted
+	as soon as it arrives. Batches that raise (or return an unexpected response)
+	fall back to per-item calls.
 	"""
 	client = get_genai_client()
-	model_id = model or os.getenv("GEMINI_EMBED_MODEL", "gemini-embedding-001")
-	out: List[List[float]] = []
 	n = len(texts)
-	i = 0
-	while i < n:
-		batch = texts[i : i + batch_size]
-		try:
-			resp = client.models.embed_content(model=model_id, contents=batch)
+	batches = [texts[i : i + batch_size] for i in range(0, n, batch_size)]
+	results: List[Any] = [None] * len(batches)
+	sem = asyncio.Semaphore(max(1, max_concurrency))
+	config = genai_types.EmbedContentConfig(output_dimensionality=output_dim) if output_dim else None
+
+	async def _embed_one(t: str) -> List[float]:
+		r = await client.aio.models.embed_content(model=model_id, contents=t, config=config)
+		return r.embeddings[0].values
+
+	async def _embed_batch(idx: int, batch: List[str]):
+		async with sem:
+			# Jitter so concurrent batches don't hit the API in lockstep (429s)
+			await asyncio.sleep(random.uniform(0, 0.05))
+			resp = await client.aio.models.embed_content(model=model_id, contents=batch, config=config)
 			if hasattr(resp, "embeddings") and resp.embeddings:
-				out.extend([e.values for e in resp.embeddings])
+				results[idx] = np.asarray([e.values for e in resp.embeddings], dtype=np.float32)
 			else:
 				# Fallback to per-item if response not as expected
-				for t in batch:
-					r = client.models.embed_content(model=model_id, contents=t)
-					out.append(r.embeddings[0].values)
-		except Exception:
-			# Fallback to per-item on exceptions
-			for t in batch:
-				r = client.models.embed_content(model=model_id, contents=t)
-				out.append(r.embeddings[0].values)
-		i += len(batch)
-	return out
+				results[idx] = np.asarray([await _embed_one(t) for t in batch], dtype=np.float32)
+
+	outcomes = await asyncio.gather(
+		*(_embed_batch(idx, batch) for idx, batch in enumerate(batches)),
+		return_exceptions=True,
+	)
+	for idx, res in enumerate(outcomes):
+		if isinstance(res, BaseException):
+			# Fallback to per-item on exceptions, for this batch only
+			results[idx] = np.asarray([await _embed_one(t) for t in batches[idx]], dtype=np.float32)
+	return np.concatenate(results, axis=0)
 
 
-def _chunk_by_length(text: str, max_len: int = 6000) -> List[str]:
+def _l2_normalize(vecs: Any) -> Any:
+	"""Scale rows of a float32 array to unit length in place (zero rows stay zero)."""
+	norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+	norms[norms == 0] = 1.0
+	vecs /= norms
+	return vecs
+
+
+def embed_texts(
+	texts: List[str],
+	model: str,
+	batch_size: int = 64,
+	*,
+	max_concurrency: int = 5,
+	output_dim: int | None = None,
+) -> Any:
+	"""Return embeddings for a list of texts using Gemini embeddings, batched.
+
+	The result is one contiguous float32 array of shape (len(texts), dim), which
+	pymilvus can serialize without boxing every component. Rows are L2-normalized
+	so inner product equals cosine similarity. Batches are sent
+	concurrently (bounded by ``max_concurrency``); falls back to per-item on
+	unexpected batch errors. Texts already in the embedding cache are not sent
+	to the API. ``output_dim`` asks the model for truncated (smaller) vectors.
+	"""
+	if np is None:
+		raise RuntimeError("numpy not installed; run 'uv add numpy'.")
+	model_id = model or os.getenv("GEMINI_EMBED_MODEL", "gemini-embedding-001")
+	if not texts:
+		return np.empty((0, output_dim or 0), dtype=np.float32)
+	kw = dict(max_concurrency=max_concurrency, output_dim=output_dim)
+	cache = _get_embed_cache()
+	if cache is None:
+		return _l2_normalize(asyncio.run(_embed_async(texts, model_id, batch_size, **kw)))
+	# Vectors of different sizes must not share cache entries
+	cache_ns = f"{model_id}@{output_dim}" if output_dim else model_id
+	hits, misses = cache.get_many(cache_ns, texts)
+	if not misses:
+		return _l2_normalize(np.stack([hits[i] for i in range(len(texts))]))
+	miss_idx = [i for i, _ in misses]
+	miss_texts = [t for _, t in misses]
+	fresh = asyncio.run(_embed_async(miss_texts, model_id, batch_size, **kw))
+	out = np.empty((len(texts), fresh.shape[1]), dtype=np.float32)
+	out[miss_idx] = fresh
+	for i, vec in hits.items():
+		out[i] = vec
+	cache.put_many(cache_ns, zip(miss_texts, fresh))
+	return _l2_normalize(out)
+
+
+_PARA_SPLIT = re.compile(r"\n\s*\n")
+_PARA_SPLIT_B = re.compile(rb"\n\s*\n")
+# Markdown image or link: ![alt](src) / [text](href)
+_MD_LINK = re.compile(r"!?\[[^\]]*\]\([^)]*\)")
+
+
+# Chunk cap; also the `text` VARCHAR max_length (bytes) of new collections
+MAX_CHUNK_LEN = 6000
+
+
+def _chunk_by_length(text: str, max_len: int = MAX_CHUNK_LEN) -> List[str]:
 	"""Split text into chunks <= max_len, preferring whitespace boundaries.
 
-	Keeps chunks comfortably under Milvus VARCHAR(8192) default limit.
+	``max_len`` defaults to MAX_CHUNK_LEN, the schema's VARCHAR length;
+	_fit_varchar enforces that limit in UTF-8 bytes. Boundaries are found
+	with bounded ``rfind`` and whitespace is trimmed by index, so each chunk
+	is sliced exactly once (no slice-then-strip copies).
 	"""
-	chunks: List[str] = []
-	i = 0
 	n = len(text)
 	if n <= max_len:
 		return [text]
+	chunks: List[str] = []
+	i = 0
 	while i < n:
 		end = min(i + max_len, n)
 		probe_start = min(n, i + int(max_len * 0.8))
 		j = text.rfind(" ", probe_start, end)
 		if j == -1 or j <= i:
 			j = end
-		chunk = text[i:j].strip()
-		if chunk:
-			chunks.append(chunk)
+		# Same as text[i:j].strip(), without the intermediate slice
+		a, k = i, j
+		while a < k and text[a].isspace():
+			a += 1
+		while k > a and text[k - 1].isspace():
+			k -= 1
+		if k > a:
+			chunks.append(text[a:k])
 		i = j
 	return chunks
 
 
-def split_markdown_paragraphs(md: str, min_len: int = 40, max_paragraphs: int = 200) -> List[str]:
-	# Split on blank lines; strip headings and image refs for cleaner chunks
-	parts = re.split(r"\n\s*\n", md)
-	cleaned: List[str] = []
+def _fit_varchar(text: str, max_bytes: int = MAX_CHUNK_LEN) -> List[str]:
+	"""Chunk text so every piece fits ``max_bytes`` of UTF-8 (Milvus VARCHAR counts bytes).
+
+	ASCII text is chunked by characters directly; only non-ASCII pieces that
+	overflow are re-split with a proportionally smaller window.
+	"""
+	out: List[str] = []
+	for piece in _chunk_by_length(text, max_len=max_bytes):
+		if piece.isascii():
+			out.append(piece)
+			continue
+		nbytes = len(piece.encode("utf-8"))
+		if nbytes <= max_bytes:
+			out.append(piece)
+			continue
+		# Re-split with a window scaled to this piece's bytes-per-char ratio
+		max_chars = max(1, int(len(piece) * max_bytes / nbytes) - 8)
+		out.extend(_fit_varchar_chars(piece, max_chars, max_bytes))
+	return out
+
+
+def _fit_varchar_chars(text: str, max_chars: int, max_bytes: int) -> List[str]:
+	out: List[str] = []
+	for piece in _chunk_by_length(text, max_len=max_chars):
+		if len(piece.encode("utf-8")) <= max_bytes or max_chars <= 1:
+			out.append(piece)
+		else:
+			out.extend(_fit_varchar_chars(piece, max(1, max_chars // 2), max_bytes))
+	return out
+
+
+def _clean_paragraphs(parts: Iterable[str], min_len: int = 40, max_paragraphs: int = 200) -> Iterator[str]:
+	"""Yield cleaned, length-capped chunks from raw paragraphs (lazy)."""
+	emitted = 0
 	for p in parts:
 		p = p.strip()
-		if not p:
+		# Skip empty paragraphs and headings before any regex work
+		if not p or p[0] == "#":
 			continue
-		# Remove markdown images and links clutter
-		p = re.sub(r"!\[[^\]]*\]\([^)]*\)", "", p)
-		p = re.sub(r"\[[^\]]*\]\([^)]*\)", "", p)
-		# Skip very short or pure headings
-		if p.startswith("#"):
-			continue
-		# Ensure each chunk fits VARCHAR limit headroom
-		for piece in _chunk_by_length(p, max_len=6000):
+		# Remove markdown images and links clutter (one pass; most paragraphs have none)
+		if "[" in p:
+			p = _MD_LINK.sub("", p)
+			# A leading image/link may have hidden a heading marker
+			if p.startswith("#"):
+				continue
+		# Ensure each chunk fits the VARCHAR limit
+		for piece in _fit_varchar(p):
 			if len(piece) < min_len:
 				continue
-			cleaned.append(piece)
-			if len(cleaned) >= max_paragraphs:
-				return cleaned
-	return cleaned
+			yield piece
+			emitted += 1
+			if emitted >= max_paragraphs:
+				return
+
+
+def split_markdown_paragraphs(md: str, min_len: int = 40, max_paragraphs: int = 200) -> List[str]:
+	# Split on blank lines; strip headings and image refs for cleaner chunks
+	return list(_clean_paragraphs(_PARA_SPLIT.split(md), min_len=min_len, max_paragraphs=max_paragraphs))
+
+
+def _iter_paragraphs(path: Path) -> Iterator[str]:
+	"""Yield raw blank-line separated paragraphs of a file without reading it whole.
+
+	The file is memory-mapped and scanned at byte level; only each paragraph
+	slice is decoded.
+	"""
+	with open(path, "rb") as fh:
+		if os.fstat(fh.fileno()).st_size == 0:
+			return
+		with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+			start = 0
+			for m in _PARA_SPLIT_B.finditer(mm):
+				yield mm[start : m.start()].decode("utf-8", "ignore")
+				start = m.end()
+			yield mm[start:].decode("utf-8", "ignore")
+
+
+def iter_markdown_chunks(path: Path, min_len: int = 40, max_paragraphs: int = 200) -> Iterator[str]:
+	"""Streaming equivalent of ``split_markdown_paragraphs(path.read_text())``."""
+	return _clean_paragraphs(_iter_paragraphs(path), min_len=min_len, max_paragraphs=max_paragraphs)
 
 
 def ensure_milvus_connection(host: str, port: str):
@@ -151,10 +417,128 @@ def ensure_milvus_connection(host: str, port: str):
 		raise RuntimeError(f"Failed to connect to Milvus at {host}:{port}. Is the server running? {e}")
 
 
-def create_collection(name: str, dim: int, *, with_hash: bool = False, drop_before: bool = False) -> Any:
+# Names of collections already load()ed by this process
+_LOADED: set[str] = set()
+
+
+def _ensure_loaded(coll: Any):
+	if coll.name in _LOADED:
+		return
+	coll.load()
+	_LOADED.add(coll.name)
+
+
+VECTOR_DTYPES = ("fp32", "fp16", "bf16")
+
+
+def _vector_datatype(vector_dtype: str) -> Any:
+	return {
+		"fp32": DataType.FLOAT_VECTOR,
+		"fp16": DataType.FLOAT16_VECTOR,
+		"bf16": DataType.BFLOAT16_VECTOR,
+	}[vector_dtype]
+
+
+@dataclass(frozen=True)
+class _CollectionLayout:
+	"""Schema facts needed per insert/search, computed once per collection."""
+
+	field_order: Tuple[str, ...]  # non-PK fields in insert order
+	field_names: frozenset[str]
+	vector_dtype: Any
+
+
+_LAYOUTS: Dict[str, _CollectionLayout] = {}
+
+
+def _get_layout(coll: Any) -> _CollectionLayout:
+	layout = _LAYOUTS.get(coll.name)
+	if layout is None:
+		fields = coll.schema.fields
+		vec_dtype = next((f.dtype for f in fields if f.name == "vector"), DataType.FLOAT_VECTOR)
+		layout = _CollectionLayout(
+			field_order=tuple(f.name for f in fields if not getattr(f, "is_primary", False)),
+			field_names=frozenset(f.name for f in fields),
+			vector_dtype=vec_dtype,
+		)
+		_LAYOUTS[coll.name] = layout
+	return layout
+
+
+def _get_vector_field_dtype(coll: Any) -> Any:
+	return _get_layout(coll).vector_dtype
+
+
+def _forget_collection(name: str):
+	"""Drop per-process caches for a collection (after it is dropped/recreated)."""
+	_LOADED.discard(name)
+	_INDEX_INFO.pop(name, None)
+	_LAYOUTS.pop(name, None)
+	_GPU_MIRRORS.pop(name, None)
+
+
+def _cast_vectors(vectors: Any, field_dtype: Any) -> Any:
+	"""Cast fp32 embeddings to the storage type of the collection's vector field."""
+	if field_dtype == DataType.FLOAT16_VECTOR:
+		return np.asarray(vectors, dtype=np.float32).astype(np.float16)
+	if field_dtype == DataType.BFLOAT16_VECTOR:
+		if ml_dtypes is None:
+			raise RuntimeError("ml_dtypes not installed; run 'uv add ml-dtypes' to use bf16 vectors.")
+		return np.asarray(vectors, dtype=np.float32).astype(ml_dtypes.bfloat16)
+	return vectors
+
+
+INDEX_TYPES = ("AUTOINDEX", "HNSW", "IVF_FLAT")
+
+# Build params per index type; search params are derived from the stored index
+_INDEX_BUILD_PARAMS: Dict[str, Dict[str, Any]] = {
+	"AUTOINDEX": {},
+	"HNSW": {"M": 16, "efConstruction": 200},
+	"IVF_FLAT": {"nlist": 128},
+}
+
+# Vector index description per collection name (index_type, metric_type, ...)
+_INDEX_INFO: Dict[str, Dict[str, Any]] = {}
+
+
+def _get_vector_index_info(coll: Any) -> Dict[str, Any]:
+	info = _INDEX_INFO.get(coll.name)
+	if info is None:
+		info = {}
+		for idx in coll.indexes:
+			if idx.field_name == "vector":
+				info = dict(idx.params)
+				break
+		_INDEX_INFO[coll.name] = info
+	return info
+
+
+def _search_params(coll: Any, limit: int) -> Dict[str, Any]:
+	"""Search params matching the collection's vector index type and metric."""
+	info = _get_vector_index_info(coll)
+	index_type = str(info.get("index_type") or "AUTOINDEX").upper()
+	if index_type == "HNSW":
+		params: Dict[str, Any] = {"ef": max(64, limit)}  # ef must be >= limit
+	elif index_type.startswith("IVF"):
+		params = {"nprobe": 16}
+	else:
+		params = {}
+	return {"metric_type": info.get("metric_type") or "COSINE", "params": params}
+
+
+def create_collection(
+	name: str,
+	dim: int,
+	*,
+	with_hash: bool = False,
+	drop_before: bool = False,
+	vector_dtype: str = "fp32",
+	index_type: str = "AUTOINDEX",
+) -> Any:
 	if utility.has_collection(name):
 		if drop_before:
 			utility.drop_collection(name)
+			_forget_collection(name)
 		else:
 			return Collection(name)
 	fields = [
@@ -163,62 +547,284 @@ def create_collection(name: str, dim: int, *, with_hash: bool = False, drop_befo
 	if with_hash:
 		fields.append(FieldSchema(name="hash", dtype=DataType.VARCHAR, max_length=64))
 	fields.extend([
-		FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=8192),
-		FieldSchema(name="vector", dtype=DataType.FLOAT_VECTOR, dim=dim),
+		FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=MAX_CHUNK_LEN),
+		FieldSchema(name="vector", dtype=_vector_datatype(vector_dtype), dim=dim),
 	])
 	schema = CollectionSchema(fields=fields, description="Demo RAG collection")
 	coll = Collection(name=name, schema=schema)
 	coll.create_index(
 		field_name="vector",
-		index_params={"index_type": "AUTOINDEX", "metric_type": "COSINE", "params": {}},
+		# Vectors are unit-normalized client-side, so IP ranks like COSINE without the per-candidate norm
+		index_params={"index_type": index_type, "metric_type": "IP", "params": _INDEX_BUILD_PARAMS[index_type]},
 	)
 	return coll
 
 
 def _get_non_pk_fields(coll: Any) -> List[str]:
-	names: List[str] = []
-	for f in coll.schema.fields:
-		if getattr(f, "is_primary", False):
-			continue
-		names.append(f.name)
-	return names
+	return list(_get_layout(coll).field_order)
+
+
+def _build_payload(layout: _CollectionLayout, tb: List[str], vb: Any, hb: List[str]) -> List[Any]:
+	"""Column-ordered insert payload; unknown extra fields get None placeholders."""
+	cols = {"text": tb, "vector": vb, "hash": hb}
+	return [cols[f] if f in cols else [None] * len(tb) for f in layout.field_order]
+
 
+# Default insert RPCs allowed in flight before waiting on the oldest (--insert-concurrency)
+INSERT_IN_FLIGHT = 4
+
+
+def _insert_rows(
+	coll: Any,
+	texts: List[str],
+	vectors: Any,
+	batch_size: int = 256,
+	hashes: List[str] | None = None,
+	max_in_flight: int = INSERT_IN_FLIGHT,
+):
+	"""Insert rows in batches with ``_async`` inserts (no flush; callers flush once).
 
-def insert_documents(coll: Any, texts: List[str], vectors: List[List[float]], batch_size: int = 256, hashes: List[str] | None = None):
+	At most ``max_in_flight`` insert RPCs are outstanding at a time.
+	"""
+	max_in_flight = max(1, max_in_flight)
 	assert len(texts) == len(vectors)
 	n = len(texts)
 	i = 0
-	field_order = _get_non_pk_fields(coll)
-	while i < n:
-		tb = texts[i : i + batch_size]
-		vb = vectors[i : i + batch_size]
-		payload: List[Any] = []
-		for field in field_order:
-			if field == "text":
-				payload.append(tb)
-			elif field == "vector":
-				payload.append(vb)
-			elif field == "hash":
-				hb = (hashes or [""] * n)[i : i + batch_size]
-				payload.append(hb)
-			else:
-				# Unknown extra field; insert empty placeholders if needed
-				payload.append([None] * len(tb))
-		coll.insert(payload)
-		i += len(tb)
+	layout = _get_layout(coll)
+	all_hashes = hashes or [""] * n
+	pending: deque = deque()
+	try:
+		while i < n:
+			tb = texts[i : i + batch_size]
+			vb = _cast_vectors(vectors[i : i + batch_size], layout.vector_dtype)  # zero-copy view for fp32
+			payload = _build_payload(layout, tb, vb, all_hashes[i : i + batch_size])
+			pending.append(coll.insert(payload, _async=True))
+			if len(pending) >= max_in_flight:
+				pending.popleft().result()
+			i += len(tb)
+	finally:
+		# Surface any insert error before the caller flushes
+		while pending:
+			pending.popleft().result()
+
+
+def insert_documents(
+	coll: Any,
+	texts: List[str],
+	vectors: Any,
+	batch_size: int = 256,
+	hashes: List[str] | None = None,
+	max_in_flight: int = INSERT_IN_FLIGHT,
+):
+	_insert_rows(coll, texts, vectors, batch_size=batch_size, hashes=hashes, max_in_flight=max_in_flight)
 	coll.flush()
 
 
-def search(coll: Any, query_vec: List[float], top_k: int = 5) -> List[Tuple[float, str, str | None]]:
-	coll.load()
+def embed_stream(
+	texts: List[str],
+	model: str,
+	batch_size: int = 64,
+	*,
+	hashes: List[str] | None = None,
+	max_concurrency: int = 5,
+	output_dim: int | None = None,
+) -> Iterator[Tuple[List[str], Any, List[str] | None]]:
+	"""Yield (texts, vectors, hashes) windows as they are embedded.
+
+	Each window holds ``batch_size * max_concurrency`` texts, enough to keep the
+	concurrent embedding path busy while only one window of vectors is resident.
+	"""
+	step = max(1, batch_size * max(1, max_concurrency))
+	for i in range(0, len(texts), step):
+		tb = texts[i : i + step]
+		hb = hashes[i : i + step] if hashes is not None else None
+		vb = embed_texts(tb, model, batch_size=batch_size, max_concurrency=max_concurrency, output_dim=output_dim)
+		yield tb, vb, hb
+
+
+def insert_stream(
+	coll: Any,
+	batches: Iterable[Tuple[List[str], Any, List[str] | None]],
+	batch_size: int = 256,
+	max_in_flight: int = INSERT_IN_FLIGHT,
+) -> int:
+	"""Insert (texts, vectors, hashes) batches on a worker thread while the next is produced.
+
+	Overlaps embedding API waits with Milvus inserts; the queue holds at most two
+	batches so memory stays bounded. Flushes once at the end and returns the row count.
+	"""
+	q: queue.Queue = queue.Queue(maxsize=2)
+	errors: List[BaseException] = []
+
+	def _consume():
+		while True:
+			item = q.get()
+			if item is None:
+				return
+			if errors:
+				continue  # keep draining so the producer never blocks
+			tb, vb, hb = item
+			try:
+				_insert_rows(coll, tb, vb, batch_size=batch_size, hashes=hb, max_in_flight=max_in_flight)
+			except BaseException as e:
+				errors.append(e)
+
+	worker = threading.Thread(target=_consume, name="milvus-insert", daemon=True)
+	worker.start()
+	total = 0
+	try:
+		for tb, vb, hb in batches:
+			if errors:
+				break
+			q.put((tb, vb, hb))
+			total += len(tb)
+	finally:
+		q.put(None)
+		worker.join()
+	if errors:
+		raise errors[0]
+	coll.flush()
+	# New rows are not in a GPU mirror built earlier; rebuild it on the next search
+	_GPU_MIRRORS.pop(coll.name, None)
+	return total
+
+
+def _stored_vector_to_f32(v: Any, field_dtype: Any) -> Any:
+	"""Decode a vector returned by Milvus (float list or fp16/bf16 bytes) to float32."""
+	if isinstance(v, list) and v and isinstance(v[0], (bytes, bytearray)):
+		v = v[0]
+	if isinstance(v, (bytes, bytearray)):
+		if field_dtype == DataType.BFLOAT16_VECTOR:
+			return np.frombuffer(v, dtype=ml_dtypes.bfloat16).astype(np.float32)
+		return np.frombuffer(v, dtype=np.float16).astype(np.float32)
+	return np.asarray(v, dtype=np.float32)
+
+
+def _cosine_scores(query: Any, cand: Any) -> Any:
+	"""Exact cosine similarity of ``query`` (dim,) against each row of ``cand`` (n, dim)."""
+	query = np.asarray(query, dtype=np.float32)
+	if simsimd is not None:
+		# simsimd returns cosine distance
+		dist = np.asarray(simsimd.cdist(query[None, :], cand, metric="cosine"), dtype=np.float32)
+		return 1.0 - dist.ravel()
+	qn = query / (np.linalg.norm(query) or 1.0)
+	norms = np.linalg.norm(cand, axis=1)
+	norms[norms == 0] = 1.0
+	return (cand @ qn) / norms
+
+
+# Collections above this many rows are mirrored into a FAISS GPU index on first
+# search (when faiss sees a GPU); smaller ones stay on Milvus ANN search
+FAISS_GPU_MIN_ROWS = 100_000
+
+
+@dataclass
+class _GpuMirror:
+	"""Read-through copy of a collection's vectors in a FAISS GPU flat index."""
+
+	index: Any
+	ids: Any  # Milvus primary key per FAISS row
+	res: Any  # StandardGpuResources; must outlive the index
+
+
+# Per collection name; None means checked and not mirrored (too small, no GPU, or build failed)
+_GPU_MIRRORS: Dict[str, _GpuMirror | None] = {}
+
+
+def _faiss_gpu_available() -> bool:
+	try:
+		return faiss is not None and faiss.get_num_gpus() > 0
+	except Exception:
+		return False
+
+
+def _build_gpu_mirror(coll: Any, layout: _CollectionLayout) -> _GpuMirror:
+	ids: List[int] = []
+	vecs: List[Any] = []
+	it = coll.query_iterator(batch_size=1000, expr="id >= 0", output_fields=["id", "vector"])
+	try:
+		while batch := it.next():
+			for row in batch:
+				ids.append(row["id"])
+				vecs.append(_stored_vector_to_f32(row["vector"], layout.vector_dtype))
+	finally:
+		it.close()
+	mat = np.ascontiguousarray(np.stack(vecs), dtype=np.float32)
+	# Inner product on unit vectors == cosine, matching the Milvus index metric
+	faiss.normalize_L2(mat)
+	res = faiss.StandardGpuResources()
+	index = faiss.index_cpu_to_gpu(res, 0, faiss.IndexFlatIP(mat.shape[1]))
+	index.add(mat)
+	return _GpuMirror(index=index, ids=np.asarray(ids, dtype=np.int64), res=res)
+
+
+def _gpu_mirror(coll: Any, layout: _CollectionLayout) -> _GpuMirror | None:
+	"""FAISS GPU mirror for large collections, built on first use; None means use Milvus."""
+	if coll.name in _GPU_MIRRORS:
+		return _GPU_MIRRORS[coll.name]
+	mirror = None
+	if _faiss_gpu_available() and coll.num_entities > FAISS_GPU_MIN_ROWS:
+		try:
+			mirror = _build_gpu_mirror(coll, layout)
+		except Exception as e:
+			print(f"WARN: FAISS GPU index unavailable, searching Milvus instead: {e}")
+	_GPU_MIRRORS[coll.name] = mirror
+	return mirror
+
+
+def _search_gpu_mirror(
+	coll: Any,
+	mirror: _GpuMirror,
+	query_vec: Any,
+	top_k: int,
+	with_section: bool,
+) -> List[Tuple[float, str, str | None]]:
+	"""Exact cosine top_k from the GPU mirror; text/section are read back from Milvus by id."""
+	q = np.array(query_vec, dtype=np.float32, ndmin=2)
+	faiss.normalize_L2(q)
+	scores, rows = mirror.index.search(q, top_k)
+	hits = [(float(d), int(mirror.ids[r])) for d, r in zip(scores[0], rows[0]) if r >= 0]
+	if not hits:
+		return []
+	ofields = ["id", "text"] + (["section"] if with_section else [])
+	found = coll.query(expr=f"id in [{','.join(str(pk) for _, pk in hits)}]", output_fields=ofields)
+	by_id = {r["id"]: r for r in found}
+	# Milvus stays the source of truth: ids deleted since the mirror was built are skipped
+	return [
+		(score, by_id[pk].get("text"), by_id[pk].get("section") if with_section else None)
+		for score, pk in hits
+		if pk in by_id
+	]
+
+
+def search(
+	coll: Any,
+	query_vec: Any,
+	top_k: int = 5,
+	*,
+	exact_rescore: bool = False,
+) -> List[Tuple[float, str, str | None]]:
+	"""ANN search; with ``exact_rescore`` hits are re-scored by exact cosine client-side.
+
+	Collections over FAISS_GPU_MIN_ROWS are served from an exact FAISS GPU mirror
+	when faiss and a GPU are available (scores are then exact without rescoring).
+	"""
+	_ensure_loaded(coll)
 	# Choose available output fields
-	field_names = [f.name for f in coll.schema.fields]
+	layout = _get_layout(coll)
+	mirror = _gpu_mirror(coll, layout)
+	if mirror is not None:
+		return _search_gpu_mirror(coll, mirror, query_vec, top_k, "section" in layout.field_names)
 	ofields = ["text"]
-	if "section" in field_names:
+	if "section" in layout.field_names:
 		ofields.append("section")
-	search_params = {"metric_type": "COSINE", "params": {"nprobe": 10}}
+	if exact_rescore:
+		ofields.append("vector")
+	search_params = _search_params(coll, top_k)
+	vec_dtype = layout.vector_dtype
+	# Query vector must match the stored vector type (fp16/bf16 collections)
 	results = coll.search(
-		data=[query_vec],
+		data=[_cast_vectors(query_vec, vec_dtype)],
 		anns_field="vector",
 		param=search_params,
 		limit=top_k,
@@ -229,9 +835,22 @@ def search(coll: Any, query_vec: List[float], top_k: int = 5) -> List[Tuple[floa
 		text = hit.entity.get("text")
 		section = hit.entity.get("section") if "section" in ofields else None
 		out.append((hit.distance, text, section))
+	if exact_rescore and out:
+		cand = np.stack([_stored_vector_to_f32(hit.entity.get("vector"), vec_dtype) for hit in results[0]])
+		scores = _cosine_scores(query_vec, cand)
+		order = np.argsort(-scores, kind="stable")
+		out = [(float(scores[i]), out[i][1], out[i][2]) for i in order]
 	return out
 
 
+def _any_substring_re(prefs: List[str] | None) -> "re.Pattern[str] | None":
+	"""Case-insensitive matcher for any of ``prefs`` (one regex pass per string)."""
+	prefs = [p for p in (prefs or []) if p]
+	if not prefs:
+		return None
+	return re.compile("|".join(map(re.escape, prefs)), re.IGNORECASE)
+
+
 def _rerank_hits_by_substring(
 	hits: List[Tuple[float, str, str | None]],
 	prefs_text: List[str] | None,
@@ -239,27 +858,68 @@ def _rerank_hits_by_substring(
 ) -> List[Tuple[float, str, str | None]]:
 	if not prefs_text and not prefs_section:
 		return hits
-	prefs_text_l = [p.lower() for p in (prefs_text or [])]
-	prefs_sec_l = [p.lower() for p in (prefs_section or [])]
-	def _key(item: Tuple[float, str, str | None]) -> Tuple[int, int, float]:
-		score, txt, sec = item
-		t = (txt or "").lower()
-		s = (sec or "").lower()
-		boost_sec = any(p in s for p in prefs_sec_l) if prefs_sec_l else False
-		boost_txt = any(p in t for p in prefs_text_l) if prefs_text_l else False
-		# Prefer section boost most, then text boost, then score desc
-		return (0 if boost_sec else 1, 0 if boost_txt else 1, -score)
-	return sorted(hits, key=_key)
+	text_re = _any_substring_re(prefs_text)
+	sec_re = _any_substring_re(prefs_section)
+	# Prefer section boost most, then text boost, then score desc
+	keys = [
+		(
+			0 if sec_re is not None and sec and sec_re.search(sec) else 1,
+			0 if text_re is not None and txt and text_re.search(txt) else 1,
+			-score,
+		)
+		for score, txt, sec in hits
+	]
+	order = sorted(range(len(hits)), key=keys.__getitem__)
+	return [hits[i] for i in order]
+
+
+# With boost preferences, fetch this many times top_k candidates so boosted
+# hits just outside the ANN top_k can still surface after reranking
+RERANK_POOL_FACTOR = 4
+
+
+def _query_and_print(
+	coll: Any,
+	qvec: Any,
+	top_k: int,
+	prefer_substr: List[str] | None,
+	prefer_section: List[str] | None,
+):
+	rerank = bool(prefer_substr or prefer_section)
+	pool = top_k * RERANK_POOL_FACTOR if rerank else top_k
+	hits = search(coll, qvec, top_k=pool, exact_rescore=rerank)
+	hits = _rerank_hits_by_substring(hits, prefer_substr, prefer_section)[:top_k]
+	print("Top results:")
+	for score, text, section in hits:
+		snippet = (text or "").replace("\n", " ")
+		if len(snippet) > 180:
+			snippet = snippet[:180]
+		prefix = f"[{section}] " if section else ""
+		print(f"- score={score:.4f} | {prefix}{snippet}")
+
+
+# Milvus caps offset+limit of a single query; larger previews page with an iterator
+_QUERY_WINDOW = 16384
+_NL_TABLE = str.maketrans({"\n": " "})
 
 
 def _print_collection_preview(coll: Any, limit: int = 5):
 	try:
-		coll.load()
-		rows = coll.query(expr="id >= 0", output_fields=["id", "text"], limit=limit)
+		_ensure_loaded(coll)
+		if limit <= _QUERY_WINDOW:
+			rows = coll.query(expr="id >= 0", output_fields=["id", "text"], limit=limit)
+		else:
+			rows = []
+			it = coll.query_iterator(batch_size=1000, limit=limit, expr="id >= 0", output_fields=["id", "text"])
+			try:
+				while batch := it.next():
+					rows.extend(batch)
+			finally:
+				it.close()
 		print(f"Showing {len(rows)} row(s):")
 		for r in rows:
 			rid = r.get("id")
-			txt = (r.get("text") or "")[:180].replace("\n", " ")
+			txt = (r.get("text") or "")[:180].translate(_NL_TABLE)
 			print(f"- id={rid} | {txt}")
 	except Exception as e:
 		print(f"Preview failed: {e}")
@@ -275,6 +935,30 @@ def _sha256(text: str) -> str:
 	return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
+def _sha256_many(texts: Iterable[str]) -> List[str]:
+	"""Batch form of ``_sha256`` with the hashlib constructor bound once (OpenSSL, SHA-NI when available)."""
+	sha256 = hashlib.sha256
+	return [sha256(t.encode("utf-8")).hexdigest() for t in texts]
+
+
+def _fetch_existing_hashes(coll: Any, hashes: List[str], chunk_size: int = 1000) -> set[str]:
+	"""Return the subset of ``hashes`` already stored in ``coll``.
+
+	Probes with a server-side ``hash in [...]`` filter in chunks, so traffic is
+	proportional to the batch rather than the collection.
+	"""
+	found: set[str] = set()
+	uniq = list(dict.fromkeys(hashes))
+	for i in range(0, len(uniq), chunk_size):
+		part = uniq[i : i + chunk_size]
+		rows = coll.query(expr=f"hash in {json.dumps(part)}", output_fields=["hash"])
+		for r in rows:
+			h = r.get("hash")
+			if h:
+				found.add(h)
+	return found
+
+
 def demo(
 	md_file: Path | None,
 	query: str | None,
@@ -285,13 +969,18 @@ def demo(
 	show: int = 0,
 	md_dir: Path | None = None,
 	embed_batch: int = 64,
+	embed_concurrency: int = 5,
 	insert_batch: int = 256,
+	insert_concurrency: int = INSERT_IN_FLIGHT,
 	drop_before: bool = False,
 	dedup: bool = False,
 	query_only: bool = False,
 	top_k: int = 5,
 	prefer_substr: List[str] | None = None,
 	prefer_section: List[str] | None = None,
+	vector_dtype: str = "fp32",
+	embed_dim: int | None = None,
+	index_type: str = "AUTOINDEX",
 ):
 	host = os.getenv("MILVUS_HOST", "localhost")
 	port = os.getenv("MILVUS_PORT", "19530")
@@ -309,16 +998,8 @@ def demo(
 		if not query:
 			return
 		# Embed and search
-		qvec = embed_texts([query], embed_model, batch_size=1)[0]
-		hits = search(coll, qvec, top_k=top_k)
-		hits = _rerank_hits_by_substring(hits, prefer_substr, prefer_section)
-		print("Top results:")
-		for score, text, section in hits:
-			snippet = (text or "").replace("\n", " ")
-			if len(snippet) > 180:
-				snippet = snippet[:180]
-			prefix = f"[{section}] " if section else ""
-			print(f"- score={score:.4f} | {prefix}{snippet}")
+		qvec = embed_texts([query], embed_model, batch_size=1, output_dim=embed_dim)[0]
+		_query_and_print(coll, qvec, top_k, prefer_substr, prefer_section)
 		return
 
 	# Prepare corpus
@@ -327,15 +1008,11 @@ def demo(
 		total_files = 0
 		for f in _iter_markdown_files(Path(md_dir)):
 			total_files += 1
-			md_text = f.read_text(encoding="utf-8", errors="ignore")
-			parts = split_markdown_paragraphs(md_text)
-			if parts:
-				corpus.extend(parts)
+			corpus.extend(iter_markdown_chunks(f))
 		if total_files:
 			print(f"Scanned {total_files} markdown file(s) under {md_dir} -> {len(corpus)} chunk(s)")
 	elif md_file and Path(md_file).exists():
-		md_text = Path(md_file).read_text(encoding="utf-8")
-		corpus = split_markdown_paragraphs(md_text)
+		corpus = list(iter_markdown_chunks(Path(md_file)))
 		if not corpus:
 			print("No suitable paragraphs found in markdown; using sample texts.")
 
@@ -348,44 +1025,52 @@ def demo(
 			"Subgroup analysis suggested heterogeneity related to mechanical ventilation and kidney therapy.",
 		]
 
-	# Get a sample embedding to determine dimension
-	sample_vec = embed_texts([corpus[0]], embed_model, batch_size=embed_batch)[0]
-	dim = len(sample_vec)
-	coll = create_collection(collection_name, dim, with_hash=True, drop_before=drop_before)
+	# Resolve the vector dimension; only unknown models need a sample embedding
+	# (served from the embedding cache on re-runs)
+	model_id = embed_model or os.getenv("GEMINI_EMBED_MODEL", "gemini-embedding-001")
+	dim = embed_dim or MODEL_DIMS.get(model_id.removeprefix("models/"))
+	if dim is None:
+		sample_vec = embed_texts([corpus[0]], embed_model, batch_size=embed_batch, max_concurrency=embed_concurrency)[0]
+		dim = len(sample_vec)
+	coll = create_collection(
+		collection_name,
+		dim,
+		with_hash=True,
+		drop_before=drop_before,
+		vector_dtype=vector_dtype,
+		index_type=index_type,
+	)
 
-	# Build dedup set (existing hashes) if requested and hash field exists
-	existing_hashes: set[str] = set()
-	non_pk_fields = _get_non_pk_fields(coll)
-	if dedup and "hash" in non_pk_fields:
-		try:
-			coll.load()
-			rows = coll.query(expr="id >= 0", output_fields=["hash"], limit=100000)
-			for r in rows:
-				h = r.get("hash")
-				if h:
-					existing_hashes.add(h)
-		except Exception as e:
-			print(f"WARN: Could not fetch existing hashes for dedup: {e}")
-
-	# Prepare hashes and optional dedup
-	hashes = [_sha256(t) for t in corpus]
-	if dedup and existing_hashes:
-		filtered_corpus: List[str] = []
-		filtered_hashes: List[str] = []
-		for t, h in zip(corpus, hashes):
-			if h in existing_hashes:
-				continue
-			filtered_corpus.append(t)
-			filtered_hashes.append(h)
-		corpus = filtered_corpus
-		hashes = filtered_hashes
+	# Prepare hashes and optional dedup (within this run and against stored rows)
+	hashes = _sha256_many(corpus)
+	if dedup:
+		existing: frozenset[str] = frozenset()
+		if "hash" in _get_non_pk_fields(coll):
+			try:
+				_ensure_loaded(coll)
+				existing = frozenset(_fetch_existing_hashes(coll, hashes))
+			except Exception as e:
+				print(f"WARN: Could not fetch existing hashes for dedup: {e}")
+		# First occurrence of each hash (reversed, so earlier indices win), minus stored ones
+		first_idx = {h: i for i, h in reversed(list(enumerate(hashes)))}
+		keep = sorted(i for h, i in first_idx.items() if h not in existing)
+		corpus = [corpus[i] for i in keep]
+		hashes = [hashes[i] for i in keep]
 
 	if not corpus:
 		print("No new documents to insert after dedup.")
 	else:
-		vectors = embed_texts(corpus, embed_model, batch_size=embed_batch)
-		insert_documents(coll, corpus, vectors, batch_size=insert_batch, hashes=hashes)
-		print(f"Inserted {len(corpus)} documents into collection '{collection_name}'. Entities now: {coll.num_entities}")
+		# Embed window N+1 while window N is being inserted
+		batches = embed_stream(
+			corpus,
+			embed_model,
+			embed_batch,
+			hashes=hashes,
+			max_concurrency=embed_concurrency,
+			output_dim=embed_dim,
+		)
+		inserted = insert_stream(coll, batches, batch_size=insert_batch, max_in_flight=insert_concurrency)
+		print(f"Inserted {inserted} documents into collection '{collection_name}'. Entities now: {coll.num_entities}")
 
 	# Show preview of stored rows if requested
 	if show and show > 0:
@@ -397,16 +1082,8 @@ def demo(
 		return
 
 	# Query flow
-	qvec = embed_texts([query], embed_model)[0]
-	hits = search(coll, qvec, top_k=top_k)
-	hits = _rerank_hits_by_substring(hits, prefer_substr, prefer_section)
-	print("Top results:")
-	for score, text, section in hits:
-		snippet = (text or "").replace("\n", " ")
-		if len(snippet) > 180:
-			snippet = snippet[:180]
-		prefix = f"[{section}] " if section else ""
-		print(f"- score={score:.4f} | {prefix}{snippet}")
+	qvec = embed_texts([query], embed_model, output_dim=embed_dim)[0]
+	_query_and_print(coll, qvec, top_k, prefer_substr, prefer_section)
 
 
 def main():
@@ -421,10 +1098,35 @@ def main():
 	parser.add_argument("--index-only", action="store_true", help="Run chunking+embedding only; skip query")
 	parser.add_argument("--query-only", action="store_true", help="Only run a query against an existing collection (no indexing)")
 	parser.add_argument("--show", type=int, default=0, help="After indexing, print N stored rows from the collection")
+	parser.add_argument(
+		"--embed-dim",
+		type=int,
+		default=None,
+		help="Request smaller embeddings (e.g. 768) from the model; must match the collection",
+	)
 	parser.add_argument("--embed-batch", type=int, default=64, help="Embedding batch size")
+	parser.add_argument("--embed-concurrency", type=int, default=5, help="Max embedding batch requests in flight (default: 5)")
 	parser.add_argument("--insert-batch", type=int, default=256, help="Insert batch size")
+	parser.add_argument(
+		"--insert-concurrency",
+		type=int,
+		default=INSERT_IN_FLIGHT,
+		help=f"Max insert RPCs in flight (default: {INSERT_IN_FLIGHT})",
+	)
 	parser.add_argument("--drop-before", action="store_true", help="Drop collection first (recreate with hash field)")
 	parser.add_argument("--dedup", action="store_true", help="Skip inserting chunks that already exist (by text hash)")
+	parser.add_argument(
+		"--vector-dtype",
+		choices=VECTOR_DTYPES,
+		default="fp32",
+		help="Vector storage type for new collections (fp16/bf16 halve size; existing collections keep theirs)",
+	)
+	parser.add_argument(
+		"--index-type",
+		choices=INDEX_TYPES,
+		default="AUTOINDEX",
+		help="Vector index for new collections (search params follow the stored index)",
+	)
 	parser.add_argument("--top-k", type=int, default=5, help="Number of results to return (default: 5)")
 	parser.add_argument(
 		"--prefer-substr",
@@ -452,12 +1154,17 @@ def main():
 		show=args.show,
 		md_dir=md_dir,
 		embed_batch=args.embed_batch,
+		embed_concurrency=args.embed_concurrency,
 		insert_batch=args.insert_batch,
+		insert_concurrency=args.insert_concurrency,
 		drop_before=args.drop_before,
 		dedup=args.dedup,
 		top_k=args.top_k,
 		prefer_substr=args.prefer_substr,
 		prefer_section=args.prefer_section,
+		vector_dtype=args.vector_dtype,
+		embed_dim=args.embed_dim,
+		index_type=args.index_type,
 	)
 
 
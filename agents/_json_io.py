@@ -0,0 +1,36 @@
+"""JSON helpers shared by the agents: orjson when installed, else the stdlib.
+
+Import as ``from agents._json_io import ...`` (repo root on sys.path) or
+``from _json_io import ...`` when an agent runs as a script.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None
+
+
+WRITE_BUFFER = 1 << 20
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def write_json(path: Path, obj: Any, pretty: bool = True) -> None:
+    """Write UTF-8 JSON, indented or compact; orjson when installed, else streamed via json.dump."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        with open(path, "wb", buffering=WRITE_BUFFER) as f:
+            f.write(orjson.dumps(obj, option=option))
+        return
+    # json.dump encodes chunk by chunk, so the full document never exists as one str
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+        if pretty:
+            json.dump(obj, f, ensure_ascii=False, indent=2)
+        else:
+            json.dump(obj, f, ensure_ascii=False, separators=(",", ":"))
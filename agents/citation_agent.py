@@ -14,9 +14,9 @@ Notes:
 
 from __future__ import annotations
 
-import json
 import os
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -32,6 +32,11 @@ except Exception as e:  # pragma: no cover
     genai = None
     genai_types = None
 
+try:  # repo root on sys.path (pipeline scripts)
+    from agents._json_io import json_loads, write_json
+except ImportError:  # run as a script from agents/
+    from _json_io import json_loads, write_json  # type: ignore
+
 
 DEFAULT_MODEL = os.getenv("GOOGLE_GENAI_MODEL", "gemini-2.5-flash-lite")
 
@@ -74,21 +79,33 @@ SCHEMA = {
 }
 
 
+# Batch form: one citation object per input document, in order
+ARRAY_SCHEMA = {"type": "array", "items": SCHEMA}
+
+# Combined Markdown per batch request; keeps several full papers well inside the context window
+MAX_BATCH_CHARS = 300_000
+
+
 @dataclass
 class CitationExtractorAgent:
     model: str = DEFAULT_MODEL
     out_dir: Path = Path("output/citations")
+    _client_cache: Any = field(default=None, init=False, repr=False)
 
     def __post_init__(self):
         self.out_dir.mkdir(parents=True, exist_ok=True)
 
     def _client(self):
+        # Reuse one client (and its HTTP connection pool) across extract() calls
+        if self._client_cache is not None:
+            return self._client_cache
         if genai is None:
             raise RuntimeError("google-genai SDK not installed. See https://googleapis.github.io/python-genai/")
         api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
         if not api_key:
             raise RuntimeError("GOOGLE_API_KEY (or GEMINI_API_KEY) is required.")
-        return genai.Client(api_key=api_key)
+        self._client_cache = genai.Client(api_key=api_key)
+        return self._client_cache
 
     def extract(self, markdown_text: str) -> Dict[str, Any]:
         client = self._client()
@@ -97,40 +114,6 @@ class CitationExtractorAgent:
             " Return a single JSON object matching the provided JSON schema."
             " If a field is unknown, omit it."
         )
-        schema = genai_types.Schema(
-            type=genai_types.Type.OBJECT,
-            properties={
-                "doi": genai_types.Schema(type=genai_types.Type.STRING),
-                "title": genai_types.Schema(type=genai_types.Type.STRING),
-                "authors": genai_types.Schema(
-                    type=genai_types.Type.ARRAY,
-                    items=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={
-                            "given": genai_types.Schema(type=genai_types.Type.STRING),
-                            "family": genai_types.Schema(type=genai_types.Type.STRING),
-                            "full": genai_types.Schema(type=genai_types.Type.STRING),
-                        },
-                    ),
-                ),
-                "container_title": genai_types.Schema(type=genai_types.Type.STRING),
-                "publisher": genai_types.Schema(type=genai_types.Type.STRING),
-                "issued": genai_types.Schema(
-                    type=genai_types.Type.OBJECT,
-                    properties={
-                        "year": genai_types.Schema(type=genai_types.Type.INTEGER),
-                        "month": genai_types.Schema(type=genai_types.Type.INTEGER),
-                        "day": genai_types.Schema(type=genai_types.Type.INTEGER),
-                    },
-                ),
-                "volume": genai_types.Schema(type=genai_types.Type.STRING),
-                "issue": genai_types.Schema(type=genai_types.Type.STRING),
-                "pages": genai_types.Schema(type=genai_types.Type.STRING),
-                "url": genai_types.Schema(type=genai_types.Type.STRING),
-            },
-            required=["title"],
-        )
-
         response = client.models.generate_content(
             model=self.model,
             contents=[{"role": "user", "parts": [
@@ -139,23 +122,79 @@ class CitationExtractorAgent:
             ]}],
             config=genai_types.GenerateContentConfig(
                 response_mime_type="application/json",
-                response_schema=schema,
+                response_json_schema=SCHEMA,
             ),
         )
         # response.text is JSON when response_mime_type=application/json
-        data = json.loads(response.text)
+        data = json_loads(response.text)
         if not isinstance(data, dict):
             raise ValueError("Structured output was not a JSON object.")
         return data
 
+    def _extract_batch(self, md_texts: List[str]) -> List[Dict[str, Any]]:
+        """One structured-output call for several documents (array of citations, in order)."""
+        if len(md_texts) == 1:
+            return [self.extract(md_texts[0])]
+        client = self._client()
+        prompt = (
+            "Extract the primary article citation from each of the following Markdown documents."
+            " Each document starts with a ---DOC i--- marker."
+            " Return a JSON array with exactly one citation object per document, in document order."
+            " If a field is unknown, omit it."
+        )
+        parts = [{"text": prompt}] + [{"text": f"---DOC {i}---\n{t}"} for i, t in enumerate(md_texts)]
+        try:
+            response = client.models.generate_content(
+                model=self.model,
+                contents=[{"role": "user", "parts": parts}],
+                config=genai_types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                    response_json_schema=ARRAY_SCHEMA,
+                ),
+            )
+            data = json_loads(response.text)
+        except Exception:
+            # Failed batch request (API error, quota, bad JSON); retry documents one by one
+            data = None
+        if not isinstance(data, list) or len(data) != len(md_texts) or not all(isinstance(d, dict) for d in data):
+            # Failed or misaligned batch answer; fall back to one call per document
+            return [self.extract(t) for t in md_texts]
+        return data
+
+    def extract_many(self, md_texts: List[str], docs_per_call: int = 5, max_workers: int = 4) -> List[Dict[str, Any]]:
+        """Extract citations for many documents, up to ``docs_per_call`` per request, requests in parallel.
+
+        A request also stops growing at MAX_BATCH_CHARS of Markdown (a larger
+        document goes alone). Returns one citation dict per input text, in input order.
+        """
+        step = max(1, docs_per_call)
+        chunks: List[List[str]] = []
+        size = 0
+        for t in md_texts:
+            if not chunks or len(chunks[-1]) >= step or size + len(t) > MAX_BATCH_CHARS:
+                chunks.append([])
+                size = 0
+            chunks[-1].append(t)
+            size += len(t)
+        if not chunks:
+            return []
+        self._client()  # create the shared client before fanning out
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as ex:
+            results = list(ex.map(self._extract_batch, chunks))
+        return [d for chunk in results for d in chunk]
+
     def extract_from_file(self, md_path: Path) -> Dict[str, Any]:
         text = Path(md_path).read_text(encoding="utf-8")
         return self.extract(text)
 
+    def extract_from_files(self, md_paths: List[Path], docs_per_call: int = 5) -> List[Dict[str, Any]]:
+        texts = [Path(p).read_text(encoding="utf-8") for p in md_paths]
+        return self.extract_many(texts, docs_per_call=docs_per_call)
+
     def save_json(self, md_path: Path, data: Dict[str, Any]) -> Path:
         stem = Path(md_path).stem
         out = self.out_dir / f"{stem}-genai.json"
-        out.write_text(json.dumps(data, indent=2, ensure_ascii=False))
+        write_json(out, data)
         return out
 
 
@@ -163,15 +202,20 @@ def _cli():
     import argparse
 
     parser = argparse.ArgumentParser(description="Extract citation from Markdown using Google GenAI structured output")
-    parser.add_argument("path", help="Path to Markdown file (e.g., output/md_with_images/xxx.md)")
+    parser.add_argument("path", nargs="+", help="Path(s) to Markdown file(s) (e.g., output/md_with_images/xxx.md)")
     parser.add_argument("--model", default=DEFAULT_MODEL, help="Gemini model id (default: gemini-2.5-flash-lite)")
+    parser.add_argument("--docs-per-call", type=int, default=5, help="Documents per Gemini request when several paths are given")
     args = parser.parse_args()
 
     agent = CitationExtractorAgent(model=args.model)
-    md_path = Path(args.path)
-    data = agent.extract_from_file(md_path)
-    out = agent.save_json(md_path, data)
-    print(f"Saved citation JSON to: {out}")
+    md_paths = [Path(p) for p in args.path]
+    if len(md_paths) == 1:
+        results = [agent.extract_from_file(md_paths[0])]
+    else:
+        results = agent.extract_from_files(md_paths, docs_per_call=args.docs_per_call)
+    for md_path, data in zip(md_paths, results):
+        out = agent.save_json(md_path, data)
+        print(f"Saved citation JSON to: {out}")
 
 
 if __name__ == "__main__":
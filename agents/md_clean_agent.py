@@ -17,10 +17,12 @@ Output:
 """
 
 import argparse
-import json
+import mmap
 import os
 import re
-from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional, Tuple, Dict, Any
 
@@ -34,25 +36,50 @@ try:
 except Exception:  # pragma: no cover
     genai = None
 
+try:  # repo root on sys.path (pipeline scripts)
+    from agents._json_io import json_loads, write_json
+except ImportError:  # run as a script from agents/
+    from _json_io import json_loads, write_json  # type: ignore
+
 
 # -----------------------------
 # Utilities
 # -----------------------------
 
 FRONT_MATTER_RE = re.compile(r"^---\s*\n(.*?)\n---\s*\n", re.DOTALL)
-HEADING_RE = re.compile(r"^(#{1,6})\s+(.+)$")
+# Front matter is matched against this many leading chars first; the whole document
+# is only scanned when the header is not closed within them.
+FRONT_MATTER_HEAD = 16384
 
 
-def split_front_matter(text: str) -> Tuple[Optional[Dict[str, Any]], str]:
-    m = FRONT_MATTER_RE.match(text)
+def _match_front_matter(text: str) -> Optional[re.Match[str]]:
+    if not text.startswith("---"):
+        return None
+    head = text[:FRONT_MATTER_HEAD]
+    m = FRONT_MATTER_RE.match(head)
+    # A head match is final unless the cut may have split the header or its trailing blank lines
+    if len(text) > FRONT_MATTER_HEAD and (m is None or not head[m.end():].strip()):
+        m = FRONT_MATTER_RE.match(text)
+    return m
+
+
+def parse_front_matter(text: str) -> Tuple[Optional[str], Optional[Dict[str, Any]], str]:
+    """Single match for the YAML header: (raw block incl. --- lines, parsed meta, body).
+
+    Without front matter, returns (None, None, text).
+    """
+    m = _match_front_matter(text)
     if not m:
-        return None, text
-    fm_text = m.group(1)
-    rest = text[m.end():]
+        return None, None, text
     try:
-        meta = yaml.safe_load(fm_text) or {}
+        meta = yaml.safe_load(m.group(1)) or {}
     except Exception:
         meta = None
+    return text[: m.end()], meta, text[m.end():]
+
+
+def split_front_matter(text: str) -> Tuple[Optional[Dict[str, Any]], str]:
+    _, meta, rest = parse_front_matter(text)
     return meta, rest
 
 
@@ -61,46 +88,63 @@ def extract_front_matter_raw(text: str) -> Tuple[Optional[str], str]:
 
     If none is found, returns (None, text).
     """
-    m = FRONT_MATTER_RE.match(text)
+    m = _match_front_matter(text)
     if not m:
         return None, text
-    raw_block = text[: m.end()]
-    rest = text[m.end():]
-    return raw_block, rest
+    return text[: m.end()], text[m.end():]
 
 
 @dataclass
 class Section:
     level: int
     title: str
-    text: str
     heading_raw: Optional[str] = None  # original heading line
-    lines: List[str] = field(default_factory=list)  # exact body lines
+    start: int = 0  # first body line (index into the parsed line list)
+    end: int = 0  # one past the last body line
+
+
+def parse_heading(line: str) -> Optional[Tuple[int, str]]:
+    """Return (level, title) for an ATX heading (1-6 '#', whitespace, text), else None.
+
+    Hand-written equivalent of matching ``^(#{1,6})\\s+(.+)$`` on the stripped line.
+    """
+    s = line.lstrip()
+    if not s.startswith("#"):
+        return None
+    level = len(s) - len(s.lstrip("#"))
+    if level > 6 or level == len(s) or not s[level].isspace():
+        return None
+    title = s[level:].strip()
+    if not title:
+        return None
+    return level, title
 
 
-def parse_sections(md: str) -> List[Section]:
+def parse_sections(md: str) -> Tuple[List[str], List[Section]]:
+    """Split Markdown into its lines and heading-delimited sections.
+
+    Sections only record line spans; body lines are sliced lazily by the caller,
+    so dropped sections are never copied or joined.
+    """
     lines = md.splitlines()
     sections: List[Section] = []
     current: Optional[Section] = None
-    for line in lines:
-        h = HEADING_RE.match(line.strip())
+    for idx, line in enumerate(lines):
+        h = parse_heading(line)
         if h:
             # Finish previous section
             if current:
-                current.text = "\n".join(current.lines)
+                current.end = idx
                 sections.append(current)
-            level = len(h.group(1))
-            title = h.group(2).strip()
-            current = Section(level=level, title=title, text="", heading_raw=line, lines=[])
-        else:
-            if current is None:
-                # Preamble before any heading
-                current = Section(level=1, title="_preamble_", text="", heading_raw=None, lines=[])
-            current.lines.append(line)
+            level, title = h
+            current = Section(level=level, title=title, heading_raw=line, start=idx + 1)
+        elif current is None:
+            # Preamble before any heading
+            current = Section(level=1, title="_preamble_", heading_raw=None, start=idx)
     if current:
-        current.text = "\n".join(current.lines)
+        current.end = len(lines)
         sections.append(current)
-    return sections
+    return lines, sections
 
 
 # -----------------------------
@@ -159,59 +203,114 @@ KEEP_SECTION_HINTS = [
 ]
 
 
-def _matches_any(s: str, patterns: List[str]) -> bool:
-    s_l = s.lower()
-    return any(re.search(p, s_l) for p in patterns)
+def _compile_union(patterns: List[str]) -> re.Pattern[str]:
+    """Compile a pattern list into one case-insensitive alternation."""
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+
+
+_DROP_SECTION_RE = _compile_union(DROP_SECTION_PATTERNS)
+_KEEP_SECTION_RE = _compile_union(KEEP_SECTION_HINTS)
+
 
+def _matches_any(s: str, compiled: re.Pattern[str]) -> bool:
+    return compiled.search(s) is not None
 
+
+@lru_cache(maxsize=4096)
 def classify_section(title: str) -> str:
     """Return 'keep' or 'drop' using heuristics."""
     if title == "_preamble_":
         # Keep preamble; later we'll prune known boilerplate lines
         return "keep"
-    if _matches_any(title, DROP_SECTION_PATTERNS):
+    if _matches_any(title, _DROP_SECTION_RE):
         return "drop"
-    if _matches_any(title, KEEP_SECTION_HINTS):
+    if _matches_any(title, _KEEP_SECTION_RE):
         return "keep"
     # Default to keep (conservative)
     return "keep"
 
 
+def is_borderline_section(title: str) -> bool:
+    """True when no DROP/KEEP rule matched, i.e. classify_section fell back to its default."""
+    if title == "_preamble_":
+        return False
+    return not (_matches_any(title, _DROP_SECTION_RE) or _matches_any(title, _KEEP_SECTION_RE))
+
+
+# Boilerplate line rules, checked against the stripped, lower-cased line.
+# Most are plain literals/prefixes; only DOI/journal-citation shapes need a regex.
+LINE_DROP_EXACT = frozenset({"jama.com"})
+LINE_DROP_PREFIXES = (
+    "accepted for publication:",
+    "published online",
+    "corresponding author:",
+    "author affiliation:",
+    "author affiliations:",
+    "group information:",
+    "copyright",
+    "correspondence to",
+)
 LINE_DROP_PATTERNS = [
-    r"^\s*jama\.com\s*$",
-    r"^\s*accepted for publication:.*$",
-    r"^\s*published online:.*$",
-    r"^\s*published online.*$",
-    r"^\s*doi:\s*10\.[0-9]{4,9}/.*$",
-    r"^\s*corresponding author:.*$",
-    r"^\s*author affiliations?:.*$",
-    r"^\s*group information:.*$",
-    r"^\s*copyright.*$",
-    r"^\s*correspondence to.*$",
-    r"^\s*JAMA\.?\s*doi:.*$",
-    r"^\s*JAMA\.?\s*Published online.*$",
-    r".*for the .*investigators.*$",
+    r"^doi:\s*10\.[0-9]{4,9}/",
+    r"^jama\.?\s*doi:",
+    r"^jama\.?\s*published online",
 ]
 
+_LINE_DROP_RE = _compile_union(LINE_DROP_PATTERNS)
+# Every LINE_DROP_PATTERNS entry is anchored and starts with one of these literals,
+# so most lines never reach the regex engine.
+_LINE_DROP_RE_PREFIXES = ("doi:", "jama")
+
+
+def _is_boilerplate_line(l: str) -> bool:
+    low = l.lower()
+    if low in LINE_DROP_EXACT or low.startswith(LINE_DROP_PREFIXES):
+        return True
+    # "... for the <group> investigators ..."
+    i = low.find("for the ")
+    if i != -1 and "investigators" in low[i + 8:]:
+        return True
+    if not low.startswith(_LINE_DROP_RE_PREFIXES):
+        return False
+    return _LINE_DROP_RE.match(low) is not None
+
 
 def prune_lines(text: str) -> str:
     # Deprecated in favor of prune_lines_list for exact formatting; kept for compatibility
     return "\n".join(prune_lines_list(text.splitlines()))
 
 
+DEGREE_TOKENS = ("PhD", "MD", "MBBS", "MNSc", "BNP", "MBiostat", "BSc", "PGDip")
+
+
+def _is_author_list_line(l: str) -> bool:
+    # Heuristic: long author-list lines (many semicolons or multiple degree acronyms)
+    if l.count(";") >= 5:
+        return True
+    if len(l) <= 100:
+        return False
+    hits = 0
+    for tok in DEGREE_TOKENS:
+        if tok in l:
+            hits += 1
+            if hits >= 3:
+                return True
+    return False
+
+
+# Shortest stripped line any drop rule can match (five semicolons); blank and very
+# short lines skip the rule checks entirely.
+MIN_DROP_LINE_LEN = 5
+
+
 def prune_lines_list(lines: List[str]) -> List[str]:
     kept: List[str] = []
+    append = kept.append
     for ln in lines:
         l = ln.strip()
-        if any(re.search(p, l, flags=re.IGNORECASE) for p in LINE_DROP_PATTERNS):
-            continue
-        # Heuristic: drop long author-list lines (many semicolons or multiple degree acronyms)
-        if l.count(";") >= 5:
-            continue
-        deg_hits = sum(1 for tok in ["PhD", "MD", "MBBS", "MNSc", "BNP", "MBiostat", "BSc", "PGDip"] if tok in l)
-        if deg_hits >= 3 and len(l) > 100:
+        if len(l) >= MIN_DROP_LINE_LEN and (_is_boilerplate_line(l) or _is_author_list_line(l)):
             continue
-        kept.append(ln)
+        append(ln)
     return kept
 
 
@@ -225,54 +324,167 @@ def get_genai_client():
     api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
     if not api_key:
         return None
+    return _client_for_key(api_key)
+
+
+@lru_cache(maxsize=4)
+def _client_for_key(api_key: str):
+    # One client (and HTTP connection pool) per key, shared by every clean_markdown() call
     try:
         return genai.Client(api_key=api_key)
     except Exception:
         return None
 
 
+_LLM_INSTRUCTIONS = (
+    "You are cleaning a scientific manuscript Markdown for RAG indexing. "
+    "KEEP scientific content (methods, results, outcomes, conclusions, discussion, tables, figures/images). "
+    "DROP author info, affiliations, contributions, groups, funding/support/roles, disclosures, acknowledgments, article information, and boilerplate."
+)
+
+_LLM_BATCH_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer"},
+            "decision": {"type": "string", "enum": ["keep", "drop"]},
+        },
+        "required": ["id", "decision"],
+    },
+}
+
+# Fewer sections than this go through llm_refine_decision one by one
+LLM_BATCH_MIN = 3
+
+
+def _llm_model() -> str:
+    return os.getenv("GEMINI_AGENT_MODEL", "gemini-2.5-flash-lite")
+
+
+# (title, hash of snippet) -> 'keep' / 'drop' / None (model gave no clear answer)
+_LLM_DECISIONS: Dict[Tuple[str, int], Optional[str]] = {}
+
+
 def llm_refine_decision(client, title: str, text: str, default: str) -> str:
     """Ask Gemini very briefly whether to keep or drop, bounded by our intent.
-    Returns 'keep' or 'drop'.
+    Returns 'keep' or 'drop'. Answers are memoized per (title, snippet).
     """
     if client is None:
         return default
+    snippet = text[:800]
+    key = (title, hash(snippet))
+    if key in _LLM_DECISIONS:
+        cached = _LLM_DECISIONS[key]
+        return cached if cached is not None else default
     try:
         prompt = (
-            "You are cleaning a scientific manuscript Markdown for RAG indexing. "
-            "Answer with a single word: KEEP or DROP. KEEP scientific content (methods, results, outcomes, conclusions, discussion, tables, figures/images). "
-            "DROP author info, affiliations, contributions, groups, funding/support/roles, disclosures, acknowledgments, article information, and boilerplate.\n\n"
-            f"Section title: {title}\n\nSnippet:\n{text[:800]}"
+            f"{_LLM_INSTRUCTIONS} Answer with a single word: KEEP or DROP.\n\n"
+            f"Section title: {title}\n\nSnippet:\n{snippet}"
         )
-        model = os.getenv("GEMINI_AGENT_MODEL", "gemini-2.5-flash-lite")
-        resp = client.models.generate_content(model=model, contents=prompt)
+        resp = client.models.generate_content(model=_llm_model(), contents=prompt)
         out = (getattr(resp, "text", None) or "").strip().upper()
-        if "DROP" in out and "KEEP" not in out:
-            return "drop"
-        if "KEEP" in out and "DROP" not in out:
-            return "keep"
-        return default
     except Exception:
+        # Transient failure: don't memoize, a later call may succeed
         return default
+    verdict: Optional[str] = None
+    if "DROP" in out and "KEEP" not in out:
+        verdict = "drop"
+    elif "KEEP" in out and "DROP" not in out:
+        verdict = "keep"
+    _LLM_DECISIONS[key] = verdict
+    return verdict if verdict is not None else default
+
+
+def llm_refine_decisions(client, items: List[Tuple[str, str, str]]) -> List[str]:
+    """Batch form of llm_refine_decision for (title, text, default) items.
+
+    Uncached items go to Gemini in one structured-output call returning
+    [{id, decision}, ...]; small batches and malformed answers fall back to
+    one call per item.
+    """
+    if client is None:
+        return [default for _, _, default in items]
+    pending = [
+        i for i, (title, text, _) in enumerate(items)
+        if (title, hash(text[:800])) not in _LLM_DECISIONS
+    ]
+    if len(pending) >= LLM_BATCH_MIN:
+        parts = [f"{_LLM_INSTRUCTIONS} Return one decision per section id.\n"]
+        for i in pending:
+            title, text, _ = items[i]
+            parts.append(f"--- Section id {i} ---\nSection title: {title}\nSnippet:\n{text[:800]}\n")
+        try:
+            resp = client.models.generate_content(
+                model=_llm_model(),
+                contents="\n".join(parts),
+                config={"response_mime_type": "application/json", "response_schema": _LLM_BATCH_SCHEMA},
+            )
+            answers = json_loads(resp.text)
+            verdicts = {int(a["id"]): a["decision"] for a in answers}
+        except Exception:
+            verdicts = {}
+        for i in pending:
+            if verdicts.get(i) in ("keep", "drop"):
+                title, text, _ = items[i]
+                _LLM_DECISIONS[(title, hash(text[:800]))] = verdicts[i]
+    # Cached (or just batched) items resolve from the memo; the rest call singly
+    return [llm_refine_decision(client, title, text, default) for title, text, default in items]
 
 
 # -----------------------------
 # Main cleaning pipeline
 # -----------------------------
 
-def clean_markdown(md_text: str, use_llm: bool = False) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
-    meta, body = split_front_matter(md_text)
-    sections = parse_sections(body)
+def _section_snippet(lines: List[str], start: int, end: int, limit: int = 800) -> str:
+    """First ``limit`` chars of the joined section, joining only the lines needed."""
+    size = 0
+    stop = start
+    while stop < end and size <= limit:
+        size += len(lines[stop]) + 1
+        stop += 1
+    return "\n".join(lines[start:stop])[:limit]
+
+
+# Below this many kept body lines, process start-up and pickling cost more than pruning
+PARALLEL_MIN_LINES = 20000
+
+
+def _prune_sections(chunks: List[List[str]], workers: int) -> List[List[str]]:
+    if workers > 1 and len(chunks) > 1 and sum(map(len, chunks)) >= PARALLEL_MIN_LINES:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            return list(ex.map(prune_lines_list, chunks, chunksize=4))
+    return [prune_lines_list(c) for c in chunks]
+
+
+def clean_markdown(
+    md_text: str, use_llm: bool = False, workers: int = 1
+) -> Tuple[Optional[str], Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Return (raw front matter block, parsed front matter, kept section blocks).
+
+    With use_llm, sections no rule matched are refined by Gemini in one batched call.
+    With workers > 1, line pruning of large documents is spread over a process pool.
+    """
+    raw_fm, meta, body = parse_front_matter(md_text)
+    lines, sections = parse_sections(body)
     client = get_genai_client() if use_llm else None
 
+    decisions = [classify_section(sec.title) for sec in sections]
+    if use_llm:
+        # Only sections no rule matched are worth a second opinion
+        borderline = [i for i, sec in enumerate(sections) if is_borderline_section(sec.title)]
+        refined = llm_refine_decisions(client, [
+            (sections[i].title, _section_snippet(lines, sections[i].start, sections[i].end), decisions[i])
+            for i in borderline
+        ])
+        for i, decision in zip(borderline, refined):
+            decisions[i] = decision
+    kept_secs = [sec for sec, decision in zip(sections, decisions) if decision != "drop"]
+
+    pruned = _prune_sections([lines[sec.start:sec.end] for sec in kept_secs], workers)
+
     kept_blocks: List[Dict[str, Any]] = []
-    for sec in sections:
-        decision = classify_section(sec.title)
-        if use_llm:
-            decision = llm_refine_decision(client, sec.title, sec.text, decision)
-        if decision == "drop":
-            continue
-        cleaned_lines = prune_lines_list(sec.lines)
+    for sec, cleaned_lines in zip(kept_secs, pruned):
         cleaned_text = "\n".join(cleaned_lines)
         if not cleaned_text.strip():
             continue
@@ -284,7 +496,7 @@ def clean_markdown(md_text: str, use_llm: bool = False) -> Tuple[Optional[Dict[s
             "heading_raw": sec.heading_raw,
             "lines": cleaned_lines,
         })
-    return meta, kept_blocks
+    return raw_fm, meta, kept_blocks
 
 
 def save_clean_json(input_path: Path, meta: Optional[Dict[str, Any]], blocks: List[Dict[str, Any]]) -> Path:
@@ -294,7 +506,7 @@ def save_clean_json(input_path: Path, meta: Optional[Dict[str, Any]], blocks: Li
         "metadata": meta or {},
         "content": blocks,
     }
-    out_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_json(out_path, payload)
     return out_path
 
 
@@ -319,19 +531,60 @@ def render_clean_markdown(front_matter_raw: Optional[str], blocks: List[Dict[str
     return "\n".join(parts).rstrip() + "\n"
 
 
-def save_clean_markdown(input_path: Path, original_md: str, blocks: List[Dict[str, Any]]) -> Path:
-    raw_fm, _ = extract_front_matter_raw(original_md)
-    md_out = render_clean_markdown(raw_fm, blocks)
+def save_clean_markdown(input_path: Path, front_matter_raw: Optional[str], blocks: List[Dict[str, Any]]) -> Path:
+    md_out = render_clean_markdown(front_matter_raw, blocks)
     out_path = input_path.with_suffix("")
     out_path = out_path.with_name(out_path.name + "-clean.md")
     out_path.write_text(md_out, encoding="utf-8")
     return out_path
 
 
+def _read_md(path: Path) -> str:
+    """Decode the file straight from an mmap: no intermediate bytes copy on the heap."""
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = str(mm, "utf-8", "ignore")
+    if "\r" in text:
+        # Match read_text()'s universal-newline translation
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def read_many(paths: List[Path], max_workers: int = 16) -> List[str]:
+    """Read several Markdown files concurrently (file reads release the GIL)."""
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(paths) or 1))) as ex:
+        return list(ex.map(_read_md, paths))
+
+
+def clean_many(
+    paths: List[Path],
+    use_llm: bool = False,
+    output_format: str = "md",
+    max_workers: int = 8,
+) -> List[Path]:
+    """Batch mode: read, clean and save each file on a thread pool.
+
+    Each file's read/write (and Gemini call with use_llm) overlaps with the others'.
+    Returns the output paths in input order.
+    """
+    def _one(path: Path) -> Path:
+        raw_fm, meta, blocks = clean_markdown(_read_md(path), use_llm=use_llm)
+        if output_format == "json":
+            return save_clean_json(path, meta, blocks)
+        return save_clean_markdown(path, raw_fm, blocks)
+
+    in_paths = [Path(p) for p in paths]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(in_paths) or 1))) as ex:
+        return list(ex.map(_one, in_paths))
+
+
 def main():
     parser = argparse.ArgumentParser(description="Clean merged-no-ref Markdown by removing non-scientific content.")
     parser.add_argument("input", type=str, help="Path to the merged-no-ref Markdown file")
     parser.add_argument("--use-llm", action="store_true", help="Use Gemini to refine keep/drop decisions (requires API key)")
+    parser.add_argument("--workers", type=int, default=1, help="Processes for line pruning on very large documents (default: 1)")
     parser.add_argument(
         "--output-format",
         choices=["md", "json"],
@@ -344,14 +597,13 @@ def main():
     if not in_path.exists():
         raise SystemExit(f"Input file not found: {in_path}")
 
-    md_text = in_path.read_text(encoding="utf-8", errors="ignore")
-    meta, blocks = clean_markdown(md_text, use_llm=args.use_llm)
+    raw_fm, meta, blocks = clean_markdown(_read_md(in_path), use_llm=args.use_llm, workers=args.workers)
 
     if args.output_format == "json":
         out_path = save_clean_json(in_path, meta, blocks)
         print(f"Saved cleaned JSON to: {out_path}")
     else:
-        out_path = save_clean_markdown(in_path, md_text, blocks)
+        out_path = save_clean_markdown(in_path, raw_fm, blocks)
         print(f"Saved cleaned Markdown to: {out_path}")
 
 
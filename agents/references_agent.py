@@ -6,6 +6,7 @@ in the same folder as the input Markdown.
 Env:
 - GOOGLE_API_KEY or GEMINI_API_KEY required
 - Default model: gemini-2.5-flash-lite (configurable)
+- REFS_PRETTY=1: indent references.json (default is compact JSON)
 
 Usage:
   uv run python agents/references_agent.py \
@@ -14,12 +15,11 @@ Usage:
 
 from __future__ import annotations
 
-import json
 import os
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 
@@ -32,43 +32,133 @@ except Exception:
     genai = None
     genai_types = None
 
+try:  # repo root on sys.path (pipeline scripts)
+    from agents._json_io import json_loads, write_json
+except ImportError:  # run as a script from agents/
+    from _json_io import json_loads, write_json  # type: ignore
+
 
 DEFAULT_MODEL = os.getenv("GOOGLE_GENAI_MODEL", "gemini-2.5-flash-lite")
 
 
+REFS_PROMPT = (
+    "Identify and extract all bibliography/references entries at the end of this Markdown. "
+    "Return an array of JSON objects, BibTeX-like, using these fields when available: "
+    "entry_type (e.g., article, book, inproceedings), key, title, authors (array of {given,family,full}), "
+    "year, month, day, journal, booktitle, volume, issue, pages, publisher, editors (array like authors), "
+    "doi, url. If a field is unknown, omit it. Do not include non-reference content."
+)
+
+_PERSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "given": {"type": "string"},
+        "family": {"type": "string"},
+        "full": {"type": "string"},
+    },
+}
+
+REF_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "entry_type": {"type": "string"},
+        "key": {"type": "string"},
+        "title": {"type": "string"},
+        "authors": {"type": "array", "items": _PERSON_SCHEMA},
+        "year": {"type": "integer"},
+        "month": {"type": "integer"},
+        "day": {"type": "integer"},
+        "journal": {"type": "string"},
+        "booktitle": {"type": "string"},
+        "volume": {"type": "string"},
+        "issue": {"type": "string"},
+        "pages": {"type": "string"},
+        "publisher": {"type": "string"},
+        "editors": {"type": "array", "items": _PERSON_SCHEMA},
+        "doi": {"type": "string"},
+        "url": {"type": "string"},
+    },
+}
+
+REFS_SCHEMA = {"type": "array", "items": REF_SCHEMA}
+
+REFS_BATCH_PROMPT = (
+    "Each document below is wrapped in <<DOC id=...>> ... <<END>> markers. "
+    "For every document, extract its bibliography/references entries as described here. "
+    + REFS_PROMPT
+    + " Return an array with one {doc_id, refs} object per document, doc_id copied from its marker."
+)
+
+REFS_BATCH_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "doc_id": {"type": "string"},
+            "refs": REFS_SCHEMA,
+        },
+        "required": ["doc_id", "refs"],
+    },
+}
+
+
+# Common headings indicating references
+_REFS_HEADINGS = [
+    r"^##+\s+references\b",
+    r"^##+\s+bibliography\b",
+    r"^##+\s+works\s+cited\b",
+    r"^#\s+references\b",
+    r"^#\s+bibliography\b",
+]
+_REFS_HEADING_RE = re.compile("|".join(_REFS_HEADINGS), flags=re.IGNORECASE | re.MULTILINE)
+# References sit at the end of a paper; search this many trailing chars first
+REFS_TAIL_CHARS = 65536
+# Next top-level heading (e.g. '# Supplement') ends the references section
+_TOP_HEADING_RE = re.compile(r"^#\s+\S", flags=re.MULTILINE)
+# Upper bound on the text sent to Gemini per document
+MAX_REFS_CHARS = 200_000
+
+
 def _slice_references_section(md_text: str) -> str:
-    """Try to slice the Markdown starting at a 'References'/'Bibliography' section.
+    """Try to slice the Markdown to its 'References'/'Bibliography' section.
 
-    Falls back to returning the full text if a clear section isn't found.
+    The slice ends at the next top-level heading (appendices, supplements) and is capped
+    at MAX_REFS_CHARS. Falls back to the last 25% of the text if a clear section isn't found.
     """
-    # Look for common headings indicating references
-    headings = [
-        r"^##+\s+references\b",
-        r"^##+\s+bibliography\b",
-        r"^##+\s+works\s+cited\b",
-        r"^#\s+references\b",
-        r"^#\s+bibliography\b",
-    ]
-    pattern = re.compile("|".join(headings), flags=re.IGNORECASE | re.MULTILINE)
-    m = pattern.search(md_text)
+    m = _REFS_HEADING_RE.search(md_text, max(0, len(md_text) - REFS_TAIL_CHARS))
+    if m is None and len(md_text) > REFS_TAIL_CHARS:
+        m = _REFS_HEADING_RE.search(md_text)
     if m:
-        return md_text[m.start():]
+        end = min(len(md_text), m.start() + MAX_REFS_CHARS)
+        nxt = _TOP_HEADING_RE.search(md_text, m.end(), end)
+        return md_text[m.start() : nxt.start() if nxt else end]
     # If no heading found, try last 25% of the document as a heuristic
     n = len(md_text)
-    return md_text[int(n * 0.75) :]
+    start = (3 * n) // 4
+    return md_text[start : start + MAX_REFS_CHARS]
+
+
+def _normalize_refs(data: List[Any]) -> List[Dict[str, Any]]:
+    # Normalize: ensure types
+    return [item for item in data if isinstance(item, dict)]
 
 
 @dataclass
 class ReferencesExtractorAgent:
     model: str = DEFAULT_MODEL
+    _client_cache: Any = field(default=None, init=False, repr=False)
 
     def _client(self):
+        # Reuse one client (and its HTTP connection pool) across extract() calls
+        if self._client_cache is not None:
+            return self._client_cache
         if genai is None:
             raise RuntimeError("google-genai SDK not installed. See https://googleapis.github.io/python-genai/")
         api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
         if not api_key:
             raise RuntimeError("GOOGLE_API_KEY (or GEMINI_API_KEY) is required.")
-        return genai.Client(api_key=api_key)
+        self._client_cache = genai.Client(api_key=api_key)
+        return self._client_cache
 
     def extract(self, markdown_text: str) -> List[Dict[str, Any]]:
         client = self._client()
@@ -76,79 +166,60 @@ class ReferencesExtractorAgent:
         # Limit to references section when possible
         refs_text = _slice_references_section(markdown_text)
 
-        prompt = (
-            "Identify and extract all bibliography/references entries at the end of this Markdown. "
-            "Return an array of JSON objects, BibTeX-like, using these fields when available: "
-            "entry_type (e.g., article, book, inproceedings), key, title, authors (array of {given,family,full}), "
-            "year, month, day, journal, booktitle, volume, issue, pages, publisher, editors (array like authors), "
-            "doi, url. If a field is unknown, omit it. Do not include non-reference content."
-        )
-
-        schema = genai_types.Schema(
-            type=genai_types.Type.ARRAY,
-            items=genai_types.Schema(
-                type=genai_types.Type.OBJECT,
-                properties={
-                    "entry_type": genai_types.Schema(type=genai_types.Type.STRING),
-                    "key": genai_types.Schema(type=genai_types.Type.STRING),
-                    "title": genai_types.Schema(type=genai_types.Type.STRING),
-                    "authors": genai_types.Schema(
-                        type=genai_types.Type.ARRAY,
-                        items=genai_types.Schema(
-                            type=genai_types.Type.OBJECT,
-                            properties={
-                                "given": genai_types.Schema(type=genai_types.Type.STRING),
-                                "family": genai_types.Schema(type=genai_types.Type.STRING),
-                                "full": genai_types.Schema(type=genai_types.Type.STRING),
-                            },
-                        ),
-                    ),
-                    "year": genai_types.Schema(type=genai_types.Type.INTEGER),
-                    "month": genai_types.Schema(type=genai_types.Type.INTEGER),
-                    "day": genai_types.Schema(type=genai_types.Type.INTEGER),
-                    "journal": genai_types.Schema(type=genai_types.Type.STRING),
-                    "booktitle": genai_types.Schema(type=genai_types.Type.STRING),
-                    "volume": genai_types.Schema(type=genai_types.Type.STRING),
-                    "issue": genai_types.Schema(type=genai_types.Type.STRING),
-                    "pages": genai_types.Schema(type=genai_types.Type.STRING),
-                    "publisher": genai_types.Schema(type=genai_types.Type.STRING),
-                    "editors": genai_types.Schema(
-                        type=genai_types.Type.ARRAY,
-                        items=genai_types.Schema(
-                            type=genai_types.Type.OBJECT,
-                            properties={
-                                "given": genai_types.Schema(type=genai_types.Type.STRING),
-                                "family": genai_types.Schema(type=genai_types.Type.STRING),
-                                "full": genai_types.Schema(type=genai_types.Type.STRING),
-                            },
-                        ),
-                    ),
-                    "doi": genai_types.Schema(type=genai_types.Type.STRING),
-                    "url": genai_types.Schema(type=genai_types.Type.STRING),
-                },
-            ),
-        )
-
         response = client.models.generate_content(
             model=self.model,
             contents=[{"role": "user", "parts": [
-                {"text": prompt},
+                {"text": REFS_PROMPT},
                 {"text": refs_text},
             ]}],
             config=genai_types.GenerateContentConfig(
                 response_mime_type="application/json",
-                response_schema=schema,
+                response_json_schema=REFS_SCHEMA,
             ),
         )
-        data = json.loads(response.text)
+        data = json_loads(response.text)
         if not isinstance(data, list):
             raise ValueError("Structured output did not return a JSON array.")
-        # Normalize: ensure types
-        norm: List[Dict[str, Any]] = []
-        for item in data:
-            if isinstance(item, dict):
-                norm.append(item)
-        return norm
+        return _normalize_refs(data)
+
+    def extract_batch(self, docs: List[Tuple[str, str]], docs_per_call: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        """Extract references for several (doc_id, markdown_text) pairs.
+
+        Documents are sent ``docs_per_call`` per request (bounded so the combined
+        answer fits the model's output budget). Any document missing from a batch
+        answer is retried on its own with extract().
+        """
+        client = self._client()
+        out: Dict[str, List[Dict[str, Any]]] = {}
+        step = max(1, docs_per_call)
+        for i in range(0, len(docs), step):
+            group = docs[i : i + step]
+            parts = [{"text": REFS_BATCH_PROMPT}] + [
+                {"text": f"<<DOC id={doc_id}>>\n{_slice_references_section(text)}\n<<END>>"}
+                for doc_id, text in group
+            ]
+            try:
+                response = client.models.generate_content(
+                    model=self.model,
+                    contents=[{"role": "user", "parts": parts}],
+                    config=genai_types.GenerateContentConfig(
+                        response_mime_type="application/json",
+                        response_json_schema=REFS_BATCH_SCHEMA,
+                    ),
+                )
+                data = json_loads(response.text)
+            except Exception:
+                # Failed batch request (API error, quota, timeout, bad JSON): every
+                # document in the group falls through to the per-document retry below
+                data = []
+            wanted = {doc_id for doc_id, _ in group}
+            for entry in data if isinstance(data, list) else []:
+                if isinstance(entry, dict) and entry.get("doc_id") in wanted and isinstance(entry.get("refs"), list):
+                    out[entry["doc_id"]] = _normalize_refs(entry["refs"])
+            for doc_id, text in group:
+                if doc_id not in out:
+                    out[doc_id] = self.extract(text)
+        return out
 
     def extract_from_file(self, md_path: Path) -> List[Dict[str, Any]]:
         text = Path(md_path).read_text(encoding="utf-8")
@@ -156,7 +227,7 @@ class ReferencesExtractorAgent:
 
     def save_json(self, md_path: Path, refs: List[Dict[str, Any]]) -> Path:
         out = Path(md_path).parent / "references.json"
-        out.write_text(json.dumps(refs, indent=2, ensure_ascii=False))
+        write_json(out, refs, pretty=os.getenv("REFS_PRETTY", "0").strip() == "1")
         return out
 
 
@@ -164,15 +235,21 @@ def _cli():
     import argparse
 
     parser = argparse.ArgumentParser(description="Extract references from Markdown using Google GenAI structured output")
-    parser.add_argument("path", help="Path to merged Markdown file")
+    parser.add_argument("path", nargs="+", help="Path(s) to merged Markdown file(s)")
     parser.add_argument("--model", default=DEFAULT_MODEL, help="Gemini model id (default: gemini-2.5-flash-lite)")
+    parser.add_argument("--docs-per-call", type=int, default=5, help="Documents per Gemini request when several paths are given")
     args = parser.parse_args()
 
     agent = ReferencesExtractorAgent(model=args.model)
-    md_path = Path(args.path)
-    refs = agent.extract_from_file(md_path)
-    out = agent.save_json(md_path, refs)
-    print(f"Saved references JSON to: {out}")
+    md_paths = [Path(p) for p in args.path]
+    if len(md_paths) == 1:
+        results = {str(md_paths[0]): agent.extract_from_file(md_paths[0])}
+    else:
+        docs = [(str(p), p.read_text(encoding="utf-8")) for p in md_paths]
+        results = agent.extract_batch(docs, docs_per_call=args.docs_per_call)
+    for md_path in md_paths:
+        out = agent.save_json(md_path, results[str(md_path)])
+        print(f"Saved references JSON to: {out}")
 
 
 if __name__ == "__main__":
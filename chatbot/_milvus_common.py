@@ -0,0 +1,573 @@
+"""Shared Gemini-embedding and Milvus plumbing for the chatbot agents.
+
+One process-wide state serves chatbot/agent.py and chatbot/db_agent.py:
+- a google-genai client per API key
+- an LRU of query embeddings keyed on (model, text), optionally backed by Redis
+- connected Milvus aliases and loaded Collection handles
+
+Env knobs:
+- GOOGLE_API_KEY or GEMINI_API_KEY: API key for google-genai
+- GEMINI_EMBED_MODEL or ADK_EMBED_MODEL: embedding model id (default gemini-embedding-001)
+- EMBED_CACHE_URL: Redis URL for a shared embedding cache (optional, needs the redis package)
+- EMBED_CACHE_TTL: seconds Redis keeps an embedding (default 86400)
+- MILVUS_HOST/MILVUS_PORT: Milvus connection (defaults 127.0.0.1:19530)
+- ADK_EMBED_COALESCE_MS: batch concurrent async query embeddings within this window (default 0, off)
+- ADK_NPROBE (default 10), ADK_SEARCH_EF (HNSW/AUTOINDEX ef, unset by default): search params
+- ADK_CONSISTENCY: search consistency level (default Bounded)
+- ADK_TWO_PHASE=1: search without `text`, then fetch it only for the hits kept after merging
+- ADK_WARMUP=1: run warm_up() on a daemon thread at import, so the first question skips cold start
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+# pymilvus is imported once here; tools report MILVUS_IMPORT_ERROR instead of re-importing per call
+try:
+    from pymilvus import Collection, connections, db as milvus_db, utility  # type: ignore
+    MILVUS_IMPORT_ERROR: Optional[Exception] = None
+except Exception as e:  # pragma: no cover
+    Collection = connections = milvus_db = utility = None  # type: ignore
+    MILVUS_IMPORT_ERROR = e
+
+
+def milvus_unavailable() -> Optional[Dict[str, Any]]:
+    """Tool error dict when pymilvus could not be imported, else None."""
+    if MILVUS_IMPORT_ERROR is None:
+        return None
+    return {"status": "error", "error_message": f"pymilvus not available: {MILVUS_IMPORT_ERROR}"}
+
+
+@lru_cache(maxsize=4)
+def get_genai_client(api_key: str):
+    """Shared google-genai client per API key, so tool calls reuse its HTTP connection pool."""
+    from google import genai  # type: ignore
+    return genai.Client(api_key=api_key)
+
+
+def embed_model_id() -> str:
+    return os.getenv("ADK_EMBED_MODEL") or os.getenv("GEMINI_EMBED_MODEL") or "gemini-embedding-001"
+
+
+def _embedding_values(resp: Any) -> Tuple[float, ...]:
+    # Adapt to SDK variants
+    if hasattr(resp, "embedding") and hasattr(resp.embedding, "values"):
+        return tuple(resp.embedding.values)
+    if hasattr(resp, "values"):
+        return tuple(resp.values)
+    if hasattr(resp, "embeddings") and resp.embeddings:
+        return tuple(resp.embeddings[0].values)
+    v = getattr(resp, "vector", None)
+    if v is not None:
+        return tuple(getattr(v, "values", v))
+    raise RuntimeError("Unexpected embedding response from google-genai")
+
+
+def _embed_client():
+    api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise RuntimeError("Missing GOOGLE_API_KEY or GEMINI_API_KEY for embeddings")
+    return get_genai_client(api_key)
+
+
+# Per-process LRU of query embeddings keyed on (model, text), shared by the sync and
+# async paths: the root agent and sub-agents often embed the same question.
+EMBED_CACHE_SIZE = 1024
+_EMBED_CACHE: "OrderedDict[Tuple[str, str], Tuple[float, ...]]" = OrderedDict()
+_EMBED_LOCK = threading.Lock()
+
+
+def _embed_cache_get(key: Tuple[str, str]) -> Optional[Tuple[float, ...]]:
+    with _EMBED_LOCK:
+        vec = _EMBED_CACHE.get(key)
+        if vec is not None:
+            _EMBED_CACHE.move_to_end(key)
+        return vec
+
+
+def _embed_cache_put(key: Tuple[str, str], vec: Tuple[float, ...]) -> None:
+    with _EMBED_LOCK:
+        _EMBED_CACHE[key] = vec
+        _EMBED_CACHE.move_to_end(key)
+        while len(_EMBED_CACHE) > EMBED_CACHE_SIZE:
+            _EMBED_CACHE.popitem(last=False)
+
+
+# Optional second tier shared across processes/restarts: Redis, vectors stored as float32 bytes
+EMBED_CACHE_TTL = int(os.getenv("EMBED_CACHE_TTL", "86400"))
+
+
+@lru_cache(maxsize=1)
+def _redis():
+    url = os.getenv("EMBED_CACHE_URL")
+    if not url:
+        return None
+    try:
+        import redis  # type: ignore
+        return redis.Redis.from_url(url)
+    except Exception:
+        return None
+
+
+def _redis_key(key: Tuple[str, str]) -> str:
+    model_id, text = key
+    return f"emb:{model_id}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+
+def _remote_get(key: Tuple[str, str]) -> Optional[Tuple[float, ...]]:
+    """Redis lookup; a hit is promoted into the in-process LRU. Errors count as misses."""
+    r = _redis()
+    if r is None:
+        return None
+    try:
+        raw = r.get(_redis_key(key))
+    except Exception:
+        return None
+    if not raw:
+        return None
+    vec = tuple(array("f", raw))
+    _embed_cache_put(key, vec)
+    return vec
+
+
+def _remote_put(key: Tuple[str, str], vec: Tuple[float, ...]) -> None:
+    r = _redis()
+    if r is None:
+        return
+    try:
+        r.setex(_redis_key(key), EMBED_CACHE_TTL, array("f", vec).tobytes())
+    except Exception:
+        pass
+
+
+EMBED_ATTEMPTS = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 4.0
+
+
+# HTTP statuses worth retrying; other API errors (auth, bad request, quota config) are terminal
+RETRY_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+_TRANSIENT_ERRORS: Tuple[type, ...] = (ConnectionError, TimeoutError)
+try:
+    import httpx  # type: ignore
+
+    _TRANSIENT_ERRORS += (httpx.TransportError,)
+except Exception:  # pragma: no cover
+    pass
+
+
+def _is_retryable(e: BaseException) -> bool:
+    """Transient network errors and retryable HTTP statuses; everything else fails fast."""
+    if isinstance(e, _TRANSIENT_ERRORS):
+        return True
+    code = getattr(e, "code", None) or getattr(e, "status_code", None)
+    return isinstance(code, int) and code in RETRY_STATUS
+
+
+def _next_delay(prev: float) -> float:
+    """Decorrelated-jitter backoff: uniform in [base, 3 * previous delay], capped."""
+    return min(BACKOFF_CAP, random.uniform(BACKOFF_BASE, prev * 3))
+
+
+def embed_query(text: str, model_id: Optional[str] = None) -> Tuple[float, ...]:
+    """Gemini embedding for the query text; transient errors are retried with backoff.
+
+    Memoized per (model, text) in-process and, with EMBED_CACHE_URL, in Redis; failures are not.
+    Returned as a tuple, which coll.search takes as-is: pymilvus packs any float sequence with
+    struct.pack, so neither a list copy nor a NumPy array (which it packs slower) is needed.
+    """
+    model_id = model_id or embed_model_id()
+    key = (model_id, text)
+    vec = _embed_cache_get(key) or _remote_get(key)
+    if vec is not None:
+        return vec
+    vec = _embed_batch([text], model_id)[0]
+    _embed_cache_put(key, vec)
+    _remote_put(key, vec)
+    return vec
+
+
+def _batch_values(resp: Any, n: int) -> List[Tuple[float, ...]]:
+    if n == 1:
+        return [_embedding_values(resp)]
+    embeddings = getattr(resp, "embeddings", None) or []
+    if len(embeddings) != n:
+        raise RuntimeError("Unexpected embedding response from google-genai")
+    return [tuple(e.values) for e in embeddings]
+
+
+def _embed_batch(texts: List[str], model_id: str) -> List[Tuple[float, ...]]:
+    """One embed_content request for all texts (uncached), retrying transient errors; vectors in order."""
+    contents: Any = texts[0] if len(texts) == 1 else list(texts)
+    last_err = None
+    delay = BACKOFF_BASE
+    for attempt in range(EMBED_ATTEMPTS):
+        try:
+            resp = _embed_client().models.embed_content(model=model_id, contents=contents)
+            return _batch_values(resp, len(texts))
+        except Exception as e:
+            last_err = e
+            if attempt + 1 == EMBED_ATTEMPTS or not _is_retryable(e):
+                break
+            delay = _next_delay(delay)
+            time.sleep(delay)
+    raise RuntimeError(f"Embedding error after retries: {last_err}")
+
+
+async def embed_query_async(text: str, model_id: Optional[str] = None) -> Tuple[float, ...]:
+    """Async twin of embed_query using the client's aio surface; same cache.
+
+    With ADK_EMBED_COALESCE_MS > 0, misses from concurrent calls are coalesced into one
+    batched embed_content request.
+    """
+    model_id = model_id or embed_model_id()
+    key = (model_id, text)
+    vec = _embed_cache_get(key)
+    if vec is None and _redis() is not None:
+        vec = await asyncio.to_thread(_remote_get, key)
+    if vec is not None:
+        return vec
+    if EMBED_COALESCE_MS > 0:
+        vec = await _embed_coalesced(text, model_id)
+    else:
+        vec = (await _embed_batch_async([text], model_id))[0]
+    _embed_cache_put(key, vec)
+    if _redis() is not None:
+        await asyncio.to_thread(_remote_put, key, vec)
+    return vec
+
+
+async def _embed_batch_async(texts: List[str], model_id: str) -> List[Tuple[float, ...]]:
+    """Async twin of _embed_batch."""
+    contents: Any = texts[0] if len(texts) == 1 else list(texts)
+    last_err = None
+    delay = BACKOFF_BASE
+    for attempt in range(EMBED_ATTEMPTS):
+        try:
+            resp = await _embed_client().aio.models.embed_content(model=model_id, contents=contents)
+            return _batch_values(resp, len(texts))
+        except Exception as e:
+            last_err = e
+            if attempt + 1 == EMBED_ATTEMPTS or not _is_retryable(e):
+                break
+            delay = _next_delay(delay)
+            # Yields the event loop to other requests while waiting
+            await asyncio.sleep(delay)
+    raise RuntimeError(f"Embedding error after retries: {last_err}")
+
+
+# Async request coalescing: concurrent embed_query_async misses wait up to this long and
+# share one batched request (flushed early at EMBED_COALESCE_MAX texts). 0 disables it.
+EMBED_COALESCE_MS = float(os.getenv("ADK_EMBED_COALESCE_MS", "0") or 0)
+EMBED_COALESCE_MAX = 64
+# (id(loop), model) -> texts waiting for the next batch, each with the futures awaiting it
+_PENDING: Dict[Tuple[int, str], Dict[str, List[asyncio.Future]]] = {}
+
+
+async def _embed_coalesced(text: str, model_id: str) -> Tuple[float, ...]:
+    loop = asyncio.get_running_loop()
+    key = (id(loop), model_id)
+    fut = loop.create_future()
+    batch = _PENDING.get(key)
+    if batch is None:
+        batch = _PENDING[key] = {}
+        loop.call_later(EMBED_COALESCE_MS / 1000.0, _flush_pending, key, batch)
+    batch.setdefault(text, []).append(fut)
+    if len(batch) >= EMBED_COALESCE_MAX:
+        _flush_pending(key, batch)
+    return await fut
+
+
+def _flush_pending(key: Tuple[int, str], batch: Dict[str, List[asyncio.Future]]) -> None:
+    # The timer of a batch already flushed at EMBED_COALESCE_MAX must not flush its successor
+    if _PENDING.get(key) is not batch:
+        return
+    del _PENDING[key]
+    asyncio.ensure_future(_run_batch(key[1], batch))
+
+
+async def _run_batch(model_id: str, batch: Dict[str, List[asyncio.Future]]) -> None:
+    texts = list(batch)
+    try:
+        vecs = await _embed_batch_async(texts, model_id)
+    except Exception as e:
+        for futs in batch.values():
+            for fut in futs:
+                if not fut.done():
+                    fut.set_exception(e)
+        return
+    for text, vec in zip(texts, vecs):
+        for fut in batch[text]:
+            if not fut.done():
+                fut.set_result(vec)
+
+
+def embed_queries(texts: List[str], model_id: Optional[str] = None) -> List[Tuple[float, ...]]:
+    """Batch form of embed_query: cached texts are reused, the rest go in one embed_content call."""
+    model_id = model_id or embed_model_id()
+    vecs: List[Optional[Tuple[float, ...]]] = [_embed_cache_get((model_id, t)) or _remote_get((model_id, t)) for t in texts]
+    missing = list(dict.fromkeys(t for t, v in zip(texts, vecs) if v is None))
+    if missing:
+        fresh = dict(zip(missing, _embed_batch(missing, model_id)))
+        for text, vec in fresh.items():
+            _embed_cache_put((model_id, text), vec)
+            _remote_put((model_id, text), vec)
+        vecs = [v if v is not None else fresh[t] for t, v in zip(texts, vecs)]
+    return vecs  # type: ignore[return-value]
+
+
+# -----------------------------
+# Milvus connection / collection cache
+# -----------------------------
+
+SEARCH_FIELDS = ("text", "section", "doi", "citation_key", "chunk_index")
+# Phase one of two-phase search: everything but the (large) chunk bodies
+TEXTLESS_FIELDS = tuple(f for f in SEARCH_FIELDS if f != "text")
+META_FIELDS = ("citation_key", "doi", "title", "journal", "issued")
+
+_MILVUS_LOCK = threading.Lock()
+# alias -> (host, port, db_name) it is connected to
+_CONNECTED: Dict[str, Tuple[str, str, Optional[str]]] = {}
+# (alias, collection) -> (loaded Collection, its schema field names); the schema of a live collection is fixed
+_COLL_CACHE: Dict[Tuple[str, str], Tuple[Any, FrozenSet[str]]] = {}
+# (alias, collection, requested fields) -> (loaded Collection, output fields present in its schema)
+_FIELDS_CACHE: Dict[Tuple[str, str, Tuple[str, ...]], Tuple[Any, List[str]]] = {}
+# (alias, collection) whose coll.load() succeeded
+_LOADED: Set[Tuple[str, str]] = set()
+# (host, port, db_name, base collection) -> (alias, collection to search)
+_DB_TARGETS: Dict[Tuple[str, str, str, str], Tuple[str, str]] = {}
+
+
+def milvus_addr() -> Tuple[str, str]:
+    return os.getenv("MILVUS_HOST", "127.0.0.1"), os.getenv("MILVUS_PORT", "19530")
+
+
+def connect(alias: str, host: str, port: str, db_name: Optional[str] = None) -> None:
+    """Connect ``alias`` once per process; reconnects only if its target changed."""
+    target = (host, port, db_name)
+    if _CONNECTED.get(alias) == target:
+        return
+    with _MILVUS_LOCK:
+        if _CONNECTED.get(alias) == target:
+            return
+        try:
+            connections.disconnect(alias)
+        except Exception:
+            pass
+        _CONNECTED.pop(alias, None)
+        for cache in (_COLL_CACHE, _FIELDS_CACHE):
+            for key in [k for k in cache if k[0] == alias]:
+                del cache[key]
+        _LOADED.difference_update([k for k in _LOADED if k[0] == alias])
+        if db_name:
+            connections.connect(alias=alias, host=host, port=port, db_name=db_name)
+        else:
+            connections.connect(alias=alias, host=host, port=port)
+        _CONNECTED[alias] = target
+
+
+@atexit.register
+def _disconnect_all() -> None:
+    """Close pooled Milvus aliases at interpreter exit."""
+    if not _CONNECTED:
+        return
+    for alias in list(_CONNECTED):
+        try:
+            connections.disconnect(alias)
+        except Exception:
+            pass
+
+
+def get_collection(name: str, fields: Tuple[str, ...] = SEARCH_FIELDS, alias: str = "default") -> Optional[Tuple[Any, List[str]]]:
+    """Return (loaded Collection, fields of ``fields`` in its schema), cached per alias.
+
+    The handle and its schema field set are shared by every field selection of a collection,
+    so e.g. two-phase and single-phase searches reuse one loaded handle.
+    Returns None when the collection does not exist (not cached, so it is found once created).
+    """
+    key = (alias, name, tuple(fields))
+    cached = _FIELDS_CACHE.get(key)
+    if cached is not None:
+        return cached
+    with _MILVUS_LOCK:
+        cached = _FIELDS_CACHE.get(key)
+        if cached is not None:
+            return cached
+        handle = _COLL_CACHE.get((alias, name))
+        if handle is None:
+            if not utility.has_collection(name, using=alias):
+                return None
+            coll = Collection(name, using=alias)
+            handle = (coll, frozenset(f.name for f in coll.schema.fields))
+            _COLL_CACHE[(alias, name)] = handle
+        coll, schema_fields = handle
+        if (alias, name) not in _LOADED:
+            try:
+                coll.load()
+                _LOADED.add((alias, name))
+            except Exception:
+                pass
+        cached = (coll, [f for f in fields if f in schema_fields])
+        # Cached (skipping load from then on) only once loaded; a failed load is retried next call
+        if (alias, name) in _LOADED:
+            _FIELDS_CACHE[key] = cached
+        return cached
+
+
+def resolve_db_target(host: str, port: str, db_name: str, coll_name: str) -> Tuple[str, str]:
+    """(alias, collection) searched for a topic DB, resolved and connected once."""
+    key = (host, port, db_name, coll_name)
+    target = _DB_TARGETS.get(key)
+    if target is not None:
+        return target
+    alias = f"db_{db_name}"
+    try:
+        connect(alias, host, port, db_name=db_name)
+        target = (alias, coll_name)
+    except Exception:
+        # Fallback for servers without DB support: collections may be suffixed
+        connect(alias, host, port)
+        target = (alias, f"{coll_name}__{db_name}")
+    _DB_TARGETS[key] = target
+    return target
+
+
+def reset_milvus_cache() -> None:
+    """Drop cached connections/handles after a failure so the next call starts fresh."""
+    with _MILVUS_LOCK:
+        _COLL_CACHE.clear()
+        _FIELDS_CACHE.clear()
+        _LOADED.clear()
+        _DB_TARGETS.clear()
+        _CONNECTED.clear()
+
+
+def search_params(limit: int) -> Dict[str, Any]:
+    """coll.search ``param``: COSINE, ADK_NPROBE (IVF indexes) and, if set, ADK_SEARCH_EF (HNSW/AUTOINDEX).
+
+    ef is raised to ``limit`` when lower, since HNSW rejects ef < limit.
+    """
+    try:
+        nprobe = max(1, int(os.getenv("ADK_NPROBE", "10")))
+    except Exception:
+        nprobe = 10
+    params: Dict[str, Any] = {"nprobe": nprobe}
+    ef_env = os.getenv("ADK_SEARCH_EF", "").strip()
+    if ef_env:
+        try:
+            params["ef"] = max(int(ef_env), int(limit))
+        except Exception:
+            pass
+    return {"metric_type": "COSINE", "params": params}
+
+
+def search_consistency() -> str:
+    """Read-only RAG tolerates a few seconds of staleness: Bounded unless ADK_CONSISTENCY says otherwise."""
+    return os.getenv("ADK_CONSISTENCY", "").strip() or "Bounded"
+
+
+def hits_to_items(hits: Any, output_fields: List[str], **extra: Any) -> List[Dict[str, Any]]:
+    """Result dicts for search hits: score, text, ``extra`` provenance, then the other output fields."""
+    # Field list resolved once per result set instead of membership checks per hit
+    rest = [f for f in output_fields if f != "text"]
+    items: List[Dict[str, Any]] = []
+    for hit in hits:
+        get = hit.entity.get
+        item = {"score": float(hit.distance), "text": get("text"), **extra}
+        for name in rest:
+            item[name] = get(name)
+        items.append(item)
+    return items
+
+
+def two_phase() -> bool:
+    """ADK_TWO_PHASE=1: search returns no `text`; fill_texts() fetches it for the kept hits."""
+    return os.getenv("ADK_TWO_PHASE", "0").strip() == "1"
+
+
+def fill_texts(rows: List[Tuple[Dict[str, Any], Any, Any]]) -> None:
+    """Set item['text'] for (item, Collection, primary key) rows, one query per collection."""
+    by_coll: Dict[int, Tuple[Any, List[Tuple[Dict[str, Any], Any]]]] = {}
+    for item, coll, pk in rows:
+        by_coll.setdefault(id(coll), (coll, []))[1].append((item, pk))
+    for coll, pairs in by_coll.values():
+        pk_name = coll.primary_field.name
+        # json.dumps renders ints bare and strings double-quoted, both valid in a Milvus `in` list
+        ids = json.dumps([pk for _, pk in pairs])
+        rows_out = coll.query(expr=f"{pk_name} in {ids}", output_fields=["text"])
+        texts = {r[pk_name]: r.get("text") for r in rows_out}
+        for item, pk in pairs:
+            item["text"] = texts.get(pk)
+
+
+async def semantic_search(coll_name: str, query: str, top_k: int, fields: Tuple[str, ...] = SEARCH_FIELDS) -> Dict[str, Any]:
+    """Search one collection on the default connection.
+
+    The query embedding and the (blocking) Milvus connect/load run concurrently.
+    Returns a dict with 'status' and 'results' or 'error_message'.
+    """
+    unavailable = milvus_unavailable()
+    if unavailable is not None:  # pragma: no cover
+        return unavailable
+
+    def _load():
+        host, port = milvus_addr()
+        connect("default", host, port)
+        return get_collection(coll_name, fields)
+
+    qvec, found = await asyncio.gather(embed_query_async(query), asyncio.to_thread(_load), return_exceptions=True)
+    if isinstance(qvec, BaseException):
+        return {"status": "error", "error_message": f"Embedding error: {qvec}"}
+    try:
+        if isinstance(found, BaseException):
+            raise found
+        if found is None:
+            return {"status": "error", "error_message": f"Collection '{coll_name}' not found"}
+        coll, output_fields = found
+        res = await asyncio.to_thread(
+            coll.search,
+            data=[qvec],
+            anns_field="vector",
+            param=search_params(top_k),
+            limit=int(top_k),
+            output_fields=output_fields,
+            consistency_level=search_consistency(),
+        )
+        return {"status": "success", "results": hits_to_items(res[0], output_fields)}
+    except Exception as e:
+        reset_milvus_cache()
+        return {"status": "error", "error_message": f"Milvus search failed: {e}"}
+
+
+def warm_up() -> None:
+    """Preload what the first question would otherwise pay for (best effort, errors ignored).
+
+    Creates the genai client with one tiny embedding, then connects Milvus and loads the
+    chunk and metadata collections into the shared handle cache.
+    """
+    try:
+        embed_query("warm")
+    except Exception:
+        pass
+    try:
+        host, port = milvus_addr()
+        connect("default", host, port)
+        get_collection(os.getenv("ADK_COLLECTION") or "paper_chunks", TEXTLESS_FIELDS if two_phase() else SEARCH_FIELDS)
+        get_collection(os.getenv("ADK_META_COLLECTION") or "papers_meta", META_FIELDS)
+    except Exception:
+        pass
+
+
+if os.getenv("ADK_WARMUP", "0").strip() == "1":
+    threading.Thread(target=warm_up, name="adk-warmup", daemon=True).start()
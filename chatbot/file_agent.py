@@ -25,7 +25,16 @@ from google.adk.tools.mcp_tool.mcp_toolset import (
 	StdioConnectionParams,
 	StdioServerParameters,
 )
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+try:
+	from rapidfuzz import fuzz, process as fuzz_process  # type: ignore
+except Exception:  # pragma: no cover
+	fuzz = None
+	fuzz_process = None
+
+# Minimum rapidfuzz partial_ratio (0-100) for a fuzzy filename match in find_pdf
+FUZZY_MIN_SCORE = 80
 
 
 def _input_abs_path() -> str:
@@ -55,6 +64,70 @@ _mcp_files = MCPToolset(
 
 _MODEL = os.getenv("ADK_MODEL", "gemini-2.5-flash")
 
+
+def _iter_pdf_entries(directory: str, dir_mtimes: Optional[Dict[str, float]] = None) -> Iterator[Tuple[os.DirEntry, str]]:
+	"""Yield (entry, lowercased name) for *.pdf files under directory, in os.walk top-down order.
+
+	os.scandir reuses the d_type from the directory listing, so entries are not stat()ed
+	one by one; unreadable directories are skipped like os.walk does. When given,
+	dir_mtimes collects the mtime of every directory listed.
+	"""
+	subdirs: List[str] = []
+	try:
+		if dir_mtimes is not None:
+			dir_mtimes[directory] = os.stat(directory).st_mtime
+		with os.scandir(directory) as it:
+			for entry in it:
+				try:
+					is_dir = entry.is_dir()
+				except OSError:
+					is_dir = False
+				if is_dir:
+					# Like os.walk(followlinks=False): symlinked dirs are not descended
+					if not entry.is_symlink():
+						subdirs.append(entry.path)
+				else:
+					lname = entry.name.lower()
+					if lname.endswith(".pdf"):
+						yield entry, lname
+	except OSError:
+		return
+	for sub in subdirs:
+		yield from _iter_pdf_entries(sub, dir_mtimes)
+
+
+# Cached PDF listing: (item, lowercased name) pairs plus the mtime of every directory walked.
+# Adding/removing/renaming a file or folder bumps its parent's mtime, so checking those
+# mtimes (one stat per directory, no listing) tells whether the index is still current.
+_PDF_INDEX: Optional[List[Tuple[Dict[str, str], str]]] = None
+_PDF_DIR_MTIMES: Dict[str, float] = {}
+
+
+def _index_is_current() -> bool:
+	for d, mtime in _PDF_DIR_MTIMES.items():
+		try:
+			if os.stat(d).st_mtime != mtime:
+				return False
+		except OSError:
+			return False
+	return True
+
+
+def _pdf_index() -> List[Tuple[Dict[str, str], str]]:
+	global _PDF_INDEX, _PDF_DIR_MTIMES
+	if _PDF_INDEX is not None and _index_is_current():
+		return _PDF_INDEX
+	dir_mtimes: Dict[str, float] = {}
+	# Entries under _ALLOWED_PATH: the relative path is a slice, no relpath/normpath work
+	cut = len(_ALLOWED_PATH) + 1
+	index = [
+		({"name": entry.name, "path": entry.path, "relative": entry.path[cut:]}, lname)
+		for entry, lname in _iter_pdf_entries(_ALLOWED_PATH, dir_mtimes)
+	]
+	_PDF_INDEX, _PDF_DIR_MTIMES = index, dir_mtimes
+	return index
+
+
 def list_input_pdfs(pattern: Optional[str] = None) -> Dict[str, Any]:
 	"""Recursively list PDF files under the allowed input/ directory.
 
@@ -68,20 +141,10 @@ def list_input_pdfs(pattern: Optional[str] = None) -> Dict[str, Any]:
 		- Primary file access should use MCP tools. This helper only surfaces
 		  likely PDF targets so the agent can follow up with MCP read_file if needed.
 	"""
-	results: List[Dict[str, str]] = []
 	try:
 		needle = (pattern or "").lower().strip()
-		for root, _dirs, files in os.walk(_ALLOWED_PATH):
-			for fn in files:
-				if fn.lower().endswith(".pdf"):
-					if needle and needle not in fn.lower():
-						continue
-					abs_path = os.path.join(root, fn)
-					try:
-						rel_path = os.path.relpath(abs_path, _ALLOWED_PATH)
-					except Exception:
-						rel_path = fn
-					results.append({"name": fn, "path": abs_path, "relative": rel_path})
+		# Copies, so callers cannot mutate the cached index
+		results = [dict(item) for item, lname in _pdf_index() if not needle or needle in lname]
 		return {"status": "success", "pdfs": results, "count": len(results)}
 	except Exception as e:  # pragma: no cover
 		return {"status": "error", "error_message": str(e), "pdfs": [], "count": 0}
@@ -96,24 +159,26 @@ def find_pdf(hint: str) -> Dict[str, Any]:
 		dict: {"status": "success", "match": {name, path, relative} } or error
 	"""
 	try:
-		res = list_input_pdfs(pattern=hint)
-		if res.get("status") != "success":
-			return res
-		pdfs: List[Dict[str, str]] = res.get("pdfs", [])
-		if not pdfs:
-			return {"status": "error", "error_message": f"No PDFs found matching '{hint}'."}
-		# Simple scoring: prefer files whose name contains the hint earlier and longer
 		lo = hint.lower().strip()
-		def score(item: Dict[str, str]) -> tuple:
-			name = item.get("name", "").lower()
-			idx = name.find(lo) if lo else -1
-			return (
-				0 if idx == -1 else 1,  # contains?
-				-idx if idx != -1 else -9999,  # earlier is better (higher -idx)
-				-len(name),  # shorter name preferred
-			)
-		best = sorted(pdfs, key=score, reverse=True)[0]
-		return {"status": "success", "match": best}
+		index = _pdf_index()
+		# Simple scoring: prefer files whose name contains the hint earlier and shorter names
+		best = None
+		best_key = None
+		for item, name in index:
+			idx = name.find(lo)
+			if idx == -1:
+				continue
+			key = (-idx, -len(name))
+			if best_key is None or key > best_key:
+				best, best_key = item, key
+		if best is None and lo and fuzz_process is not None and index:
+			# No substring hit: fall back to fuzzy filename matching when rapidfuzz is installed
+			hit = fuzz_process.extractOne(lo, [name for _item, name in index], scorer=fuzz.partial_ratio, score_cutoff=FUZZY_MIN_SCORE)
+			if hit is not None:
+				best = index[hit[2]][0]
+		if best is None:
+			return {"status": "error", "error_message": f"No PDFs found matching '{hint}'."}
+		return {"status": "success", "match": dict(best)}
 	except Exception as e:  # pragma: no cover
 		return {"status": "error", "error_message": str(e)}
 
@@ -24,11 +24,12 @@ from google.adk.agents import Agent
 DOWNLOADS_DIR = os.path.join(os.path.dirname(__file__), "downloads")
 
 
+_SLUG_BAD = re.compile(r"[^a-z0-9\-\_\s]")
+_SLUG_WS = re.compile(r"\s+")
+
+
 def _slugify(text: str) -> str:
-    text = text.strip().lower()
-    text = re.sub(r"[^a-z0-9\-\_\s]", "", text)
-    text = re.sub(r"\s+", "-", text)
-    return text or "summary"
+    return _SLUG_WS.sub("-", _SLUG_BAD.sub("", text.strip().lower())) or "summary"
 
 
 def save_markdown_to_downloads(title: str, content_markdown: str) -> Dict[str, str]:
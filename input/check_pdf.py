@@ -6,21 +6,27 @@ No-LLM PDF checker: extract DOI and Title from a scientific journal article PDF.
 Strategy
 - Try PDF metadata (XMP) for title.
 - Scan first 1–2 pages of text for a DOI via regex; normalize it.
-- If DOI is found, call Crossref to fetch authoritative title.
+- If DOI is found, call Crossref to fetch authoritative title (cached on disk in .cache/crossref.sqlite).
 - If no DOI, heuristically pick the largest-font line on page 1 as the title.
-- Optional: OCR page 1 if the PDF is scanned (requires pytesseract + Pillow).
+- Optional: OCR page 1 if the PDF is scanned (tesserocr, or pytesseract + Pillow).
 
 Outputs
 - Prints informative messages to the console (what was detected and how).
 - Emits final JSON: {"title": str, "doi": str}
 """
 
+import asyncio
+import atexit
 import json
 import os
 import re
+import sqlite3
+import threading
+import time
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 import fitz  # PyMuPDF
@@ -35,13 +41,32 @@ except Exception:  # fallback when running as script from repo root
 		DoiBibliographyClient = None  # type: ignore
 
 
+# Optional: tesserocr runs Tesseract in-process; pytesseract (a subprocess per call) is the fallback
+try:
+	from tesserocr import PyTessBaseAPI  # type: ignore
+except Exception:  # pragma: no cover
+	PyTessBaseAPI = None
+
+_TESS_LOCK = threading.Lock()
+
+
+# Optional: google-re2 scans long page text in linear time (DFA, no backtracking)
+try:
+	import re2  # type: ignore
+except Exception:  # pragma: no cover
+	re2 = None
+
+
 DOI_REGEX = re.compile(r"\b10\.\d{4,9}/[-._;()/:A-Z0-9]+\b", re.IGNORECASE)
+_DOI_URL_RE = re.compile(r"^https?://(dx\.)?doi\.org/", re.IGNORECASE)
+# Same pattern with an inline flag, which RE2 accepts as well
+_DOI_SCANNER = re2.compile(r"(?i)\b10\.\d{4,9}/[-._;()/:A-Z0-9]+\b") if re2 is not None else None
 
 
 def normalize_doi(raw: str) -> str:
 	s = raw.strip()
 	# Strip URL prefixes if present
-	s = re.sub(r"^https?://(dx\.)?doi\.org/", "", s, flags=re.IGNORECASE)
+	s = _DOI_URL_RE.sub("", s)
 	# Remove surrounding punctuation
 	s = s.strip(" \t\r\n.,;)>")
 	# Lowercase doi except keep original slash parts
@@ -55,59 +80,128 @@ def extract_pdf_metadata(doc: fitz.Document) -> Dict[str, Optional[str]]:
 	return {"title": title, "doi": None}
 
 
-def first_pages_text(doc: fitz.Document, pages: int = 2) -> str:
-	n = min(pages, doc.page_count)
-	parts = []
-	for i in range(n):
+def _iter_page_texts(doc: fitz.Document, pages: int = 2, first_page_text: Optional[str] = None):
+	"""Yield the plain text of the first pages lazily; first_page_text reuses an existing parse of page 0."""
+	for i in range(min(pages, doc.page_count)):
+		if i == 0 and first_page_text is not None:
+			yield first_page_text
+			continue
 		try:
-			txt = doc.load_page(i).get_text()
-			parts.append(txt or "")
+			yield doc.load_page(i).get_text() or ""
 		except Exception:
 			continue
-	return "\n".join(parts)
+
+
+def first_pages_text(doc: fitz.Document, pages: int = 2, first_page_text: Optional[str] = None) -> str:
+	"""Plain text of the first pages; first_page_text reuses an existing parse of page 0."""
+	return "\n".join(_iter_page_texts(doc, pages, first_page_text=first_page_text))
 
 
 def find_doi_in_text(text: str) -> Optional[str]:
-	m = DOI_REGEX.search(text or "")
+	if not text:
+		return None
+	if _DOI_SCANNER is not None:
+		m = _DOI_SCANNER.search(text)
+	else:
+		# Every DOI starts with the literal "10.": jump between those offsets with str.find
+		# and run the regex anchored there instead of letting search() try every position
+		m = None
+		i = text.find("10.")
+		while i != -1:
+			m = DOI_REGEX.match(text, i)
+			if m:
+				break
+			i = text.find("10.", i + 1)
 	if not m:
 		return None
 	return normalize_doi(m.group(0))
 
 
-def first_page_largest_font_title(doc: fitz.Document) -> Optional[str]:
-	if doc.page_count == 0:
-		return None
-	page = doc.load_page(0)
-	try:
-		data = page.get_text("dict")
-	except Exception:
-		return None
-	best: Tuple[float, str] = (0.0, "")
+# Spans containing these are not titles
+_NON_TITLE_MARKERS = ("doi:", "www.", "http://", "https://", "copyright")
+# "dict" output without image blocks: those carry the raw image bytes, which the title scan never reads
+_TITLE_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+def _largest_font_span(data: Dict[str, Any]) -> Optional[str]:
+	"""Largest-font span of a page's "dict" output that does not look like boilerplate."""
+	best_size = 0.0
+	best_text = ""
 	for block in data.get("blocks", []):
 		for line in block.get("lines", []):
 			for span in line.get("spans", []):
-				text = (span.get("text") or "").strip()
 				size = float(span.get("size") or 0)
-				if not text or len(text) < 5:
+				# Only a strictly larger span can win, so test the size before touching the text
+				if size <= best_size:
+					continue
+				text = (span.get("text") or "").strip()
+				if len(text) < 5:
 					continue
 				# Skip lines likely not titles
 				lower = text.lower()
-				if any(k in lower for k in ["doi:", "www.", "http://", "https://", "copyright"]):
+				if any(k in lower for k in _NON_TITLE_MARKERS):
 					continue
-				if size > best[0]:
-					best = (size, text)
-	return best[1] or None
+				best_size, best_text = size, text
+	return best_text or None
 
 
-def render_page1_and_ocr(doc: fitz.Document) -> Optional[str]:
+def first_page_largest_font_title(doc: fitz.Document) -> Optional[str]:
+	if doc.page_count == 0:
+		return None
+	page = doc.load_page(0)
 	try:
-		import pytesseract  # type: ignore
-		from PIL import Image  # type: ignore
+		data = page.get_text("dict", flags=_TITLE_TEXT_FLAGS)
 	except Exception:
 		return None
+	return _largest_font_span(data)
+
+
+def first_page_text_and_title(doc: fitz.Document) -> Tuple[Optional[str], Optional[str]]:
+	"""Plain text and largest-font title of page 1 from a single "dict" parse.
+
+	Lines are the concatenated spans of each "dict" line, joined by newlines as get_text() does.
+	"""
+	if doc.page_count == 0:
+		return None, None
+	try:
+		data = doc.load_page(0).get_text("dict", flags=_TITLE_TEXT_FLAGS)
+	except Exception:
+		return None, None
+	lines = [
+		"".join(span.get("text") or "" for span in line.get("spans", []))
+		for block in data.get("blocks", [])
+		for line in block.get("lines", [])
+	]
+	return "\n".join(lines) + "\n", _largest_font_span(data)
+
+
+@lru_cache(maxsize=1)
+def _tess_api():
+	# Loading the language model dominates small OCR jobs, so one API serves every page
+	api = PyTessBaseAPI()
+	atexit.register(api.End)
+	return api
+
+
+def render_page1_and_ocr(doc: fitz.Document) -> Optional[str]:
 	if doc.page_count == 0:
 		return None
 	page = doc.load_page(0)
+	if PyTessBaseAPI is not None:
+		# Hand the pixmap buffer straight to Tesseract: no PIL copy, no temp image file
+		pix = page.get_pixmap(dpi=200, colorspace=fitz.csGRAY)
+		try:
+			with _TESS_LOCK:
+				api = _tess_api()
+				api.SetImageBytes(pix.samples, pix.width, pix.height, pix.n, pix.stride)
+				return api.GetUTF8Text()
+		except Exception:
+			return None
+	try:
+		import pytesseract  # type: ignore
+		from PIL import Image  # type: ignore
+	except Exception:
+		return None
 	pix = page.get_pixmap(dpi=200)
 	img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
 	try:
@@ -149,39 +243,179 @@ class PDFCheckResult:
 	citation_key: str
 
 
-def check_pdf(path: Path, pages_to_scan: int = 2, use_ocr: bool = False) -> PDFCheckResult:
+@dataclass
+class PDFLocalInfo:
+	"""What check_pdf learns from the file itself, before any network lookup."""
+	doi: Optional[str]
+	doi_source: str
+	meta_title: Optional[str]
+	heuristic_title: Optional[str]
+
+
+def extract_local(path: Path, pages_to_scan: int = 2, use_ocr: bool = False) -> PDFLocalInfo:
+	"""Local pass of check_pdf: PDF metadata, DOI from the first pages, largest-font title."""
 	doc = fitz.open(path)
 
 	# 1) Metadata
 	meta = extract_pdf_metadata(doc)
 	meta_title = meta.get("title")
 
-	# 2) Extract text from first pages (or OCR if requested)
-	text = first_pages_text(doc, pages=pages_to_scan)
-	if use_ocr and (not text or len(text.strip()) < 40):
-		ocr_text = render_page1_and_ocr(doc)
-		if ocr_text:
-			text = (text + "\n" + ocr_text).strip()
-
-	# 3) Find DOI
-	doi = find_doi_in_text(text)
+	# Heuristic title is only a fallback behind PDF metadata, so skip it when that exists;
+	# when it is needed, page 1 is parsed once for both its text and the title
+	page1_text, heuristic = first_page_text_and_title(doc) if not meta_title else (None, None)
+
+	# 2) + 3) Scan the first pages for a DOI, page by page: a DOI on page 1 spares parsing the rest
+	doi = None
+	parts: List[str] = []
+	for page_text in _iter_page_texts(doc, pages_to_scan, first_page_text=page1_text):
+		parts.append(page_text)
+		doi = find_doi_in_text(page_text)
+		if doi:
+			break
+	if not doi and use_ocr:
+		# Scanned PDF (little or no text layer): OCR page 1 and search again
+		text = "\n".join(parts)
+		if not text or len(text.strip()) < 40:
+			ocr_text = render_page1_and_ocr(doc)
+			if ocr_text:
+				doi = find_doi_in_text((text + "\n" + ocr_text).strip())
 	doi_source = "first_pages_regex" if doi else "none"
 
+	return PDFLocalInfo(doi=doi, doi_source=doi_source, meta_title=meta_title, heuristic_title=heuristic)
+
+
+# On-disk CSL cache keyed by DOI, so known DOIs skip Crossref on later runs ("" disables it)
+CROSSREF_CACHE_PATH = os.getenv("CROSSREF_CACHE", str(Path(__file__).resolve().parent.parent / ".cache" / "crossref.sqlite"))
+CROSSREF_CACHE_DAYS = float(os.getenv("CROSSREF_CACHE_DAYS", "30"))
+
+
+class CrossrefCache:
+	"""SQLite table of CSL-JSON per lowercased DOI; entries older than max_age_days are ignored.
+
+	Only successful lookups are stored. SQLite errors disable the cache instead of failing the run.
+	"""
+
+	def __init__(self, path: Path, max_age_days: float = CROSSREF_CACHE_DAYS):
+		self.max_age_s = max_age_days * 86400
+		self._conn: Optional[sqlite3.Connection] = None
+		try:
+			path.parent.mkdir(parents=True, exist_ok=True)
+			self._conn = sqlite3.connect(path)
+			self._conn.execute(
+				"CREATE TABLE IF NOT EXISTS crossref (doi TEXT PRIMARY KEY, csl_json TEXT NOT NULL, fetched_at INTEGER NOT NULL)"
+			)
+		except sqlite3.Error:
+			self._conn = None
+
+	def get_many(self, dois: List[str]) -> Dict[str, Dict[str, Any]]:
+		keys = list(dict.fromkeys(d.lower() for d in dois))
+		if self._conn is None or not keys:
+			return {}
+		cutoff = int(time.time() - self.max_age_s)
+		out: Dict[str, Dict[str, Any]] = {}
+		try:
+			# Chunked to stay under SQLite's bound-parameter limit
+			for i in range(0, len(keys), 500):
+				chunk = keys[i : i + 500]
+				rows = self._conn.execute(
+					f"SELECT doi, csl_json FROM crossref WHERE fetched_at >= ? AND doi IN ({','.join('?' * len(chunk))})",
+					[cutoff, *chunk],
+				)
+				for doi, csl_json in rows:
+					out[doi] = json.loads(csl_json)
+		except (sqlite3.Error, ValueError):
+			return out
+		return out
+
+	def put_many(self, items: Dict[str, Optional[Dict[str, Any]]]) -> None:
+		rows = [(doi.lower(), json.dumps(csl, ensure_ascii=False), int(time.time())) for doi, csl in items.items() if csl]
+		if self._conn is None or not rows:
+			return
+		try:
+			with self._conn:
+				self._conn.executemany("INSERT OR REPLACE INTO crossref VALUES (?, ?, ?)", rows)
+		except sqlite3.Error:
+			pass
+
+
+@lru_cache(maxsize=1)
+def _crossref_cache() -> Optional[CrossrefCache]:
+	return CrossrefCache(Path(CROSSREF_CACHE_PATH)) if CROSSREF_CACHE_PATH else None
+
+
+def resolve_metadata_batch(dois: List[str]) -> Dict[str, Dict[str, Any]]:
+	"""CSL-JSON for many DOIs: {lowercased DOI: csl}.
+
+	The on-disk cache first, then batched Crossref requests; DOIs those miss are
+	fetched concurrently one by one. DOIs that still failed (e.g. a 429 or 5xx)
+	are left out, so resolve_pdf() retries them with its full per-DOI fallback.
+	"""
+	if DoiBibliographyClient is None or not dois:
+		return {}
+	cache = _crossref_cache()
+	found: Dict[str, Dict[str, Any]] = dict(cache.get_many(dois)) if cache else {}
+	todo = [d for d in dict.fromkeys(dois) if d.lower() not in found]
+	if not todo:
+		return found
+	client = DoiBibliographyClient()
+	fresh: Dict[str, Optional[Dict[str, Any]]] = {}
+	try:
+		fresh.update(client.fetch_csl_batch(todo))
+	except Exception:
+		pass
+	missing = [d for d in todo if d.lower() not in fresh]
+	if missing:
+		try:
+			fresh.update(asyncio.run(client.fetch_csl_all(missing)))
+		except Exception:
+			pass
+	if cache:
+		cache.put_many(fresh)
+	found.update((doi, csl) for doi, csl in fresh.items() if csl)
+	return found
+
+
+def _csl_title(csl: Optional[Dict[str, Any]]) -> Optional[str]:
+	if not isinstance(csl, dict):
+		return None
+	csl_title = csl.get("title")
+	if isinstance(csl_title, list):
+		csl_title = csl_title[0] if csl_title else None
+	return str(csl_title) if csl_title else None
+
+
+def resolve_pdf(local: PDFLocalInfo, csl_map: Optional[Dict[str, Dict[str, Any]]] = None) -> PDFCheckResult:
+	"""Network pass of check_pdf: title and CSL for a local result.
+
+	csl_map holds CSL from resolve_metadata_batch(); DOIs missing from it are fetched here.
+	"""
+	doi = local.doi
+	doi_source = local.doi_source
+
 	# 4) Title resolution (and CSL metadata via Crossref when DOI exists)
 	title = None
 	title_source = "none"
 	csl: Optional[Dict[str, Any]] = None
 	if doi:
+		prefetched = (csl_map or {}).get(doi.lower())
+		if prefetched is not None:
+			# Already resolved by resolve_metadata_batch()
+			csl = prefetched
+			csl_title = _csl_title(csl)
+			if csl_title:
+				title, title_source = csl_title, "crossref_csl"
 		# Prefer full CSL-JSON via Crossref (authoritative title, authors, year, etc.)
-		if DoiBibliographyClient is not None:
+		elif DoiBibliographyClient is not None:
+			cache = _crossref_cache()
 			try:
-				csl = DoiBibliographyClient().fetch_csl(doi)
-				if isinstance(csl, dict):
-					csl_title = csl.get("title")
-					if isinstance(csl_title, list):
-						csl_title = csl_title[0] if csl_title else None
-					if csl_title:
-						title, title_source = str(csl_title), "crossref_csl"
+				csl = (cache.get_many([doi]) if cache else {}).get(doi.lower())
+				if csl is None:
+					csl = DoiBibliographyClient().fetch_csl(doi)
+					if cache:
+						cache.put_many({doi: csl})
+				csl_title = _csl_title(csl)
+				if csl_title:
+					title, title_source = csl_title, "crossref_csl"
 			except Exception:
 				# Fall back to direct Crossref title endpoint if CSL fetch fails
 				csl = None
@@ -189,12 +423,10 @@ def check_pdf(path: Path, pages_to_scan: int = 2, use_ocr: bool = False) -> PDFC
 			cr_title = crossref_title_for_doi(doi)
 			if cr_title:
 				title, title_source = cr_title, "crossref"
-	if not title and meta_title:
-		title, title_source = meta_title, "pdf_metadata"
-	if not title:
-		heuristic = first_page_largest_font_title(doc)
-		if heuristic:
-			title, title_source = heuristic, "largest_font_heuristic"
+	if not title and local.meta_title:
+		title, title_source = local.meta_title, "pdf_metadata"
+	if not title and local.heuristic_title:
+		title, title_source = local.heuristic_title, "largest_font_heuristic"
 
 	if not title:
 		title = "Unknown"
@@ -214,14 +446,20 @@ def check_pdf(path: Path, pages_to_scan: int = 2, use_ocr: bool = False) -> PDFC
 	)
 
 
+def check_pdf(path: Path, pages_to_scan: int = 2, use_ocr: bool = False) -> PDFCheckResult:
+	return resolve_pdf(extract_local(path, pages_to_scan=pages_to_scan, use_ocr=use_ocr))
+
+
 # --- Citation key helpers ---
 STOPWORDS = {"the", "a", "an", "of", "and", "in", "on", "for", "to", "with"}
+_NON_ALNUM_RUN_RE = re.compile(r"[^a-z0-9]+")
+_NON_ALNUM_RE = re.compile(r"[^A-Za-z0-9]")
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
 
 
 def _slug(s: str, max_len: int = 30) -> str:
-	s = s.lower()
-	s = re.sub(r"[^a-z0-9]+", " ", s)
-	s = "".join(part for part in s.split())  # collapse to alphanum contiguous
+	# Drop everything outside [a-z0-9] in one pass (collapse to alphanum contiguous)
+	s = _NON_ALNUM_RUN_RE.sub("", s.lower())
 	if len(s) > max_len:
 		s = s[:max_len]
 	return s or "key"
@@ -253,7 +491,7 @@ def _first_author_family(csl: Optional[Dict[str, Any]]) -> str:
 			a0 = authors[0]
 			fam = a0.get("family") or a0.get("last") or a0.get("surname")
 			if isinstance(fam, str) and fam.strip():
-				return re.sub(r"[^A-Za-z0-9]", "", fam.strip().lower()) or "anon"
+				return _NON_ALNUM_RE.sub("", fam.strip().lower()) or "anon"
 	except Exception:
 		pass
 	# Fallback to publisher or container-title if no authors
@@ -262,12 +500,12 @@ def _first_author_family(csl: Optional[Dict[str, Any]]) -> str:
 		if isinstance(v, list):
 			v = v[0] if v else None
 		if isinstance(v, str) and v.strip():
-			return re.sub(r"[^A-Za-z0-9]", "", v.strip().split()[0].lower()) or "anon"
+			return _NON_ALNUM_RE.sub("", v.strip().split()[0].lower()) or "anon"
 	return "anon"
 
 
 def _short_title_component(title: str, max_len: int = 20) -> str:
-	words = re.findall(r"[A-Za-z0-9]+", (title or "").lower())
+	words = _WORD_RE.findall((title or "").lower())
 	words = [w for w in words if w not in STOPWORDS]
 	if not words:
 		return "art"
@@ -289,7 +527,7 @@ def _build_citation_key(csl: Optional[Dict[str, Any]], fallback_title: str) -> s
 		title = fallback_title or "Untitled"
 	short = _short_title_component(title, max_len=24)
 	key = f"{fam}{year}{short}"
-	key = re.sub(r"[^a-z0-9]", "", key.lower())
+	key = _NON_ALNUM_RE.sub("", key.lower())
 	return key or _slug(title)
 
 
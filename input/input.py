@@ -7,7 +7,8 @@ Behavior
 - List PDFs in input/pdf/ and in topic folders input/topics/<topic>/.
 - Prefer citation-key-based deduplication and filenames.
 - For each PDF, if its stem equals an existing citation_key, treat as existing.
-- Else, run extractor (check_pdf.check_pdf) → title, doi, citation_key, csl.
+- Else, run the local extractor (check_pdf.extract_local); DOIs from all new PDFs are then
+  resolved in batched Crossref requests (check_pdf.resolve_pdf) → title, doi, citation_key, csl.
 - Rename the PDF to citation_key.pdf within its directory (input/pdf/ or the topic subfolder).
 - Deduplicate by citation_key first, then DOI. Merge in missing fields when possible.
 - Records from topic folders are annotated with {"topic": "<topic>"} for topic-aware indexing.
@@ -23,29 +24,35 @@ JSON format: list of objects like:
 """
 
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 try:
 	# When run as a module: python -m input.input
-	from input.check_pdf import check_pdf, normalize_doi  # type: ignore
+	from input.check_pdf import PDFLocalInfo, extract_local, normalize_doi, resolve_metadata_batch, resolve_pdf  # type: ignore
 	from input.utils import (
 		load_db,
 		save_db,
-		find_by_key,
-		find_by_doi,
-		find_by_title,
+		build_indices,
+		index_item,
+		normalize_doi_key,
+		normalize_key,
+		normalize_title,
 		safe_filename_from_key,
 		unique_path,
 	)
 except Exception:  # When run as a script: python input/input.py
-	from check_pdf import check_pdf, normalize_doi  # type: ignore
+	from check_pdf import PDFLocalInfo, extract_local, normalize_doi, resolve_metadata_batch, resolve_pdf  # type: ignore
 	from utils import (
 		load_db,
 		save_db,
-		find_by_key,
-		find_by_doi,
-		find_by_title,
+		build_indices,
+		index_item,
+		normalize_doi_key,
+		normalize_key,
+		normalize_title,
 		safe_filename_from_key,
 		unique_path,
 	)
@@ -55,6 +62,8 @@ ROOT = Path(__file__).resolve().parent
 INPUT_DIR = ROOT / "pdf"
 JSON_PATH = ROOT / "input_pdf.json"
 TOPICS_DIR = ROOT / "topics"
+# Processes for local PDF extraction (PyMuPDF parsing holds the GIL); 0 = one per CPU
+EXTRACT_WORKERS = int(os.getenv("INPUT_EXTRACT_WORKERS", "0")) or os.cpu_count() or 1
 
 
 def _ensure_pdf_dir() -> None:
@@ -62,9 +71,21 @@ def _ensure_pdf_dir() -> None:
 	TOPICS_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _extract_all(paths: List[Path]) -> List[PDFLocalInfo]:
+	"""extract_local() for each path, in order; spread over processes when there are several."""
+	workers = min(EXTRACT_WORKERS, len(paths))
+	if workers <= 1:
+		return [extract_local(p) for p in paths]
+	with ProcessPoolExecutor(max_workers=workers) as ex:
+		return list(ex.map(extract_local, paths))
+
+
 def main() -> None:
 	_ensure_pdf_dir()
 	items = load_db(JSON_PATH)
+	# Dict indices over the registry so each dedup lookup is O(1) instead of a scan of items
+	indices = build_indices(items, normalizer=normalize_doi)
+	by_key, by_doi, by_title = indices
 	changed = False
 
 	# Also move stray PDFs in input/ into input/pdf (do not move topic PDFs)
@@ -89,6 +110,8 @@ def main() -> None:
 		print("No PDFs found in input/ or input/topics/.")
 		return
 
+	# Pass 1: pick the PDFs that need extraction; network lookups are batched afterwards
+	todo: list[tuple[Path, str | None, str]] = []
 	for pdf in all_pdfs:
 		topic_name: str | None = None
 		try:
@@ -99,14 +122,27 @@ def main() -> None:
 			topic_name = None
 		stem = pdf.stem.strip()
 		# If the filename already looks like a citation key, check by key first
-		existing_by_key = find_by_key(items, stem)
+		existing_by_key = by_key.get(normalize_key(stem)) if stem else None
 		if existing_by_key:
 			print(f"Found existing entry for '{pdf.name}' by citation_key match:")
 			print(json.dumps(existing_by_key, indent=2, ensure_ascii=False))
 			continue
 
 		print(f"Extracting from: {pdf.name} ...")
-		res = check_pdf(pdf)
+		todo.append((pdf, topic_name, stem))
+
+	# Local extraction is independent per file, so run it in parallel
+	extracted = _extract_all([pdf for pdf, _, _ in todo])
+	pending = [(pdf, topic_name, stem, local) for (pdf, topic_name, stem), local in zip(todo, extracted)]
+
+	# Resolve every extracted DOI up front: batched Crossref requests, then concurrent per-DOI fetches
+	dois = [local.doi for _, _, _, local in pending if local.doi]
+	csl_map = resolve_metadata_batch(dois) if dois else {}
+	if dois:
+		print(f"Resolved {len(csl_map)}/{len({d.lower() for d in dois})} DOI(s) via Crossref.")
+
+	for pdf, topic_name, stem, local in pending:
+		res = resolve_pdf(local, csl_map)
 
 		# If no real DOI was found, assign a stable synthetic one based on PDF content
 		def _is_real_doi(s: str) -> bool:
@@ -114,7 +150,9 @@ def main() -> None:
 		if not _is_real_doi(res.doi):
 			try:
 				import hashlib
-				h = hashlib.sha256(pdf.read_bytes()).hexdigest()[:16]
+				# Stream the file through the hash instead of loading the whole PDF into memory
+				with open(pdf, "rb") as f:
+					h = hashlib.file_digest(f, "sha256").hexdigest()[:16]
 				synthetic_doi = f"doc:{h}"
 			except Exception:
 				synthetic_doi = "doc:unknown"
@@ -144,7 +182,7 @@ def main() -> None:
 				print(f"[warn] Failed to rename '{pdf.name}': {e}")
 
 		# Dedup by citation_key first
-		existing_k = find_by_key(items, res.citation_key)
+		existing_k = by_key.get(normalize_key(res.citation_key)) if res.citation_key else None
 		if existing_k:
 			# Merge missing fields (upgrade path for older entries)
 			merged = False
@@ -163,13 +201,14 @@ def main() -> None:
 				merged = True
 			if merged:
 				changed = True
+				index_item(indices, existing_k, normalizer=normalize_doi)
 				print(f"Merged fields into existing entry for key '{res.citation_key}'.")
 			else:
 				print(f"Entry already exists for key '{res.citation_key}'.")
 			continue
 
 		# Then dedup by DOI (authoritative)
-		existing_d = find_by_doi(items, res.doi, normalizer=normalize_doi)
+		existing_d = by_doi.get(normalize_doi_key(res.doi, normalize_doi)) if res.doi else None
 		if existing_d:
 			# If DOI exists but citation_key missing or different, attach/normalize
 			if not existing_d.get("citation_key"):
@@ -185,11 +224,12 @@ def main() -> None:
 			if topic_name and not existing_d.get("topic"):
 				existing_d["topic"] = topic_name
 				changed = True
+			index_item(indices, existing_d, normalizer=normalize_doi)
 			print(f"Linked existing DOI entry to key '{res.citation_key}'.")
 			continue
 
 		# As a final fallback, attempt title-based match (for legacy entries)
-		existing_t = find_by_title(items, res.title)
+		existing_t = by_title.get(normalize_title(res.title))
 		if existing_t:
 			if not existing_t.get("citation_key"):
 				existing_t["citation_key"] = res.citation_key
@@ -203,12 +243,14 @@ def main() -> None:
 			if topic_name and not existing_t.get("topic"):
 				existing_t["topic"] = topic_name
 				changed = True
+			index_item(indices, existing_t, normalizer=normalize_doi)
 			print(f"Linked legacy title entry to key '{res.citation_key}'.")
 			continue
 
 		# New entry
 		print(f"Adding new entry: {record}")
 		items.append(record)
+		index_item(indices, record, normalizer=normalize_doi)
 		changed = True
 
 	if changed:
@@ -6,22 +6,27 @@ Utilities for the input pipeline.
 Responsibilities
 - Safe filename and path helpers
 - JSON DB load/save
-- Deduplication helpers (by citation_key, DOI, title)
+- Deduplication helpers (by citation_key, DOI, title) and their dict indices
 """
 
 import json
+import re
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 # --- filename/path helpers ---
 
+# Everything str.isalnum() rejects: \W plus the underscore that \w allows
+_NON_ALNUM_RE = re.compile(r"[\W_]+")
+
+
 def safe_filename_from_key(key: str) -> str:
     """Sanitize a citation key for filesystem usage.
 
     Keys are expected to be [a-z0-9]; we enforce and cap length.
     """
-    s = "".join(ch for ch in (key or "").lower() if ch.isalnum())
+    s = _NON_ALNUM_RE.sub("", (key or "").lower())
     if not s:
         s = "key"
     if len(s) > 80:
@@ -74,12 +79,26 @@ def save_db(path: Path, items: List[Dict[str, Any]]) -> None:
 
 # --- dedup helpers ---
 
+def normalize_key(key: Optional[str]) -> str:
+    """Citation keys compare case-insensitively, ignoring surrounding whitespace."""
+    return str(key or "").strip().lower()
+
+
+def normalize_doi_key(doi: str, normalizer) -> str:
+    """DOI comparison key: ``normalizer`` output (raw DOI if it raises), casefolded."""
+    try:
+        d = normalizer(str(doi))
+    except Exception:
+        d = str(doi).strip()
+    return d.casefold()
+
+
 def find_by_key(items: List[Dict[str, Any]], key: Optional[str]) -> Optional[Dict[str, Any]]:
     if not key:
         return None
-    k = str(key).strip().lower()
+    k = normalize_key(key)
     for obj in items:
-        v = str(obj.get("citation_key", "")).strip().lower()
+        v = normalize_key(obj.get("citation_key", ""))
         if v and v == k:
             return obj
     return None
@@ -97,18 +116,40 @@ def find_by_title(items: List[Dict[str, Any]], title: str) -> Optional[Dict[str,
 def find_by_doi(items: List[Dict[str, Any]], doi: Optional[str], *, normalizer) -> Optional[Dict[str, Any]]:
     if not doi:
         return None
-    try:
-        key = normalizer(str(doi))
-    except Exception:
-        key = str(doi).strip()
+    key = normalize_doi_key(doi, normalizer)
     for obj in items:
         v = obj.get("doi")
         if not v:
             continue
-        try:
-            vd = normalizer(str(v))
-        except Exception:
-            vd = str(v).strip()
-        if vd.casefold() == key.casefold():
+        if normalize_doi_key(v, normalizer) == key:
             return obj
     return None
+
+
+# --- dict indices (O(1) counterparts of the find_by_* helpers) ---
+
+Indices = Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]
+
+
+def build_indices(items: List[Dict[str, Any]], *, normalizer) -> Indices:
+    """Index items as ``(by_key, by_doi, by_title)``, keyed like find_by_key/find_by_doi/find_by_title.
+
+    Look up with ``normalize_key``, ``normalize_doi_key`` and ``normalize_title``;
+    the first item wins on collisions, as with the linear helpers.
+    """
+    indices: Indices = ({}, {}, {})
+    for obj in items:
+        index_item(indices, obj, normalizer=normalizer)
+    return indices
+
+
+def index_item(indices: Indices, obj: Dict[str, Any], *, normalizer) -> None:
+    """Add a new or just-merged item to indices from build_indices (existing entries are kept)."""
+    by_key, by_doi, by_title = indices
+    k = normalize_key(obj.get("citation_key", ""))
+    if k:
+        by_key.setdefault(k, obj)
+    v = obj.get("doi")
+    if v:
+        by_doi.setdefault(normalize_doi_key(v, normalizer), obj)
+    by_title.setdefault(normalize_title(str(obj.get("title", ""))), obj)
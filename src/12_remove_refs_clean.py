@@ -114,8 +114,7 @@ def process_single(md_path: Path) -> Tuple[bool, Path | None]:
 
 	# 3) Clean Markdown using md_clean_agent (rule-based by default)
 	clean_mod = _import_md_clean_agent()
-	meta, blocks = clean_mod.clean_markdown(stripped_md, use_llm=False)  # type: ignore[attr-defined]
-	raw_fm, _ = clean_mod.extract_front_matter_raw(stripped_md)  # type: ignore[attr-defined]
+	raw_fm, _meta, blocks = clean_mod.clean_markdown(stripped_md, use_llm=False)  # type: ignore[attr-defined]
 	cleaned_md = clean_mod.render_clean_markdown(raw_fm, blocks)  # type: ignore[attr-defined]
 	out_rag.write_text(cleaned_md, encoding="utf-8")
 	print(f"[ok] Wrote RAG Markdown: {out_rag}")
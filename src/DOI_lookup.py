@@ -14,12 +14,14 @@ Notes:
 
 from __future__ import annotations
 
+import asyncio
+import importlib.util
 import json
 import os
 import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional
 
 import httpx
 from dotenv import load_dotenv
@@ -28,11 +30,22 @@ load_dotenv()
 
 
 CSL_CONTENT_TYPE = "application/vnd.citationstyles.csl+json"
+# DOIs per Crossref /works?filter=doi:... request (the filter stays well under URL limits)
+CROSSREF_BATCH_SIZE = 50
+# In-flight per-DOI requests for fetch_csl_all; well inside Crossref's polite-pool rate limit
+CROSSREF_CONCURRENCY = int(os.getenv("CROSSREF_CONCURRENCY", "8"))
+# HTTP/2 multiplexing needs the optional h2 package (pip install httpx[http2])
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+_UNSAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9._-]")
+_DOI_URL_RE = re.compile(r"^https?://(dx\.)?doi\.org/", re.IGNORECASE)
+_NON_ALNUM_RUN_RE = re.compile(r"[^A-Za-z0-9]+")
 
 
 def _safe_filename_from_doi(doi: str) -> str:
     # Replace unsafe path characters with '_'
-    return re.sub(r"[^A-Za-z0-9._-]", "_", doi.strip().lower())
+    return _UNSAFE_FILENAME_RE.sub("_", doi.strip().lower())
 
 
 @dataclass
@@ -59,7 +72,7 @@ class DoiBibliographyClient:
             raise ValueError("Empty DOI")
         doi = doi.strip()
         # Remove protocol/host if present
-        doi = re.sub(r"^https?://(dx\.)?doi\.org/", "", doi, flags=re.IGNORECASE)
+        doi = _DOI_URL_RE.sub("", doi)
         # Basic validation heuristic: must contain a '/'
         if "/" not in doi:
             raise ValueError(f"Invalid DOI format: {doi}")
@@ -82,7 +95,7 @@ class DoiBibliographyClient:
         """
         norm = self.normalize_doi(doi)
         # Try Crossref REST: https://api.crossref.org/works/{doi}
-        crossref_url = f"https://api.crossref.org/works/{httpx.URL('/'+norm).raw_path.decode().lstrip('/')}"
+        crossref_url = self._crossref_work_url(norm)
         # The response is a Crossref wrapper: { status, message-type, message-version, message: {...} }
         with httpx.Client(timeout=self.timeout_s, headers=self._headers()) as client:
             r = client.get(crossref_url)
@@ -109,6 +122,98 @@ class DoiBibliographyClient:
                 # Some responses might be text; attempt to parse when possible
                 raise ValueError("DOI.org did not return valid CSL-JSON")
 
+    @staticmethod
+    def _crossref_work_url(norm: str) -> str:
+        return f"https://api.crossref.org/works/{httpx.URL('/'+norm).raw_path.decode().lstrip('/')}"
+
+    async def fetch_csl_async(self, client: httpx.AsyncClient, doi: str) -> Dict[str, Any]:
+        """fetch_csl() on a shared ``httpx.AsyncClient`` (Crossref first, then DOI.org)."""
+        norm = self.normalize_doi(doi)
+        r = await client.get(self._crossref_work_url(norm))
+        if r.status_code == 200:
+            message = r.json().get("message")
+            if isinstance(message, dict):
+                csl = self._crossref_message_to_csl(message)
+                if csl:
+                    return csl
+        else:
+            r.raise_for_status()
+
+        r2 = await client.get(f"https://doi.org/{norm}", headers={"Accept": CSL_CONTENT_TYPE}, follow_redirects=True)
+        r2.raise_for_status()
+        try:
+            return r2.json()
+        except json.JSONDecodeError:
+            raise ValueError("DOI.org did not return valid CSL-JSON")
+
+    async def fetch_csl_all(self, dois: Iterable[str], concurrency: int = CROSSREF_CONCURRENCY) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Fetch CSL-JSON for DOIs one request each, ``concurrency`` at a time over one pooled client.
+
+        For DOIs fetch_csl_batch() cannot serve (other registrars, commas in the DOI).
+        Returns ``{lowercased DOI: csl}``, with None for DOIs that could not be fetched.
+        """
+        todo = list(dict.fromkeys(dois))
+        if not todo:
+            return {}
+        sem = asyncio.Semaphore(max(1, concurrency))
+        limits = httpx.Limits(max_connections=max(1, concurrency), max_keepalive_connections=16)
+
+        async with httpx.AsyncClient(
+            timeout=self.timeout_s, headers=self._headers(), limits=limits, http2=_HTTP2
+        ) as client:
+
+            async def one(doi: str) -> Optional[Dict[str, Any]]:
+                async with sem:
+                    try:
+                        return await self.fetch_csl_async(client, doi)
+                    except (httpx.HTTPError, ValueError):
+                        return None
+
+            results = await asyncio.gather(*(one(d) for d in todo))
+        return {d.lower(): csl for d, csl in zip(todo, results)}
+
+    def fetch_csl_batch(self, dois: Iterable[str], batch_size: int = CROSSREF_BATCH_SIZE) -> Dict[str, Dict[str, Any]]:
+        """Fetch CSL-JSON for many DOIs with Crossref's ``/works?filter=doi:...`` endpoint.
+
+        One request per ``batch_size`` DOIs instead of one per DOI. Returns
+        ``{lowercased DOI: csl}``; DOIs Crossref does not return (or whose chunk
+        failed) are absent, so callers can fall back to fetch_csl().
+        """
+        norms = []
+        seen = set()
+        for doi in dois:
+            try:
+                norm = self.normalize_doi(doi)
+            except ValueError:
+                continue
+            # Commas separate filter clauses, so such DOIs can only be fetched one by one
+            if "," in norm or norm.lower() in seen:
+                continue
+            seen.add(norm.lower())
+            norms.append(norm)
+
+        out: Dict[str, Dict[str, Any]] = {}
+        if not norms:
+            return out
+        size = max(1, batch_size)
+        with httpx.Client(timeout=self.timeout_s, headers=self._headers()) as client:
+            for i in range(0, len(norms), size):
+                chunk = norms[i : i + size]
+                params = {"filter": ",".join(f"doi:{d}" for d in chunk), "rows": str(len(chunk))}
+                try:
+                    r = client.get("https://api.crossref.org/works", params=params)
+                    r.raise_for_status()
+                    items = (r.json().get("message") or {}).get("items") or []
+                except (httpx.HTTPError, ValueError):
+                    continue
+                for message in items:
+                    if not isinstance(message, dict):
+                        continue
+                    csl = self._crossref_message_to_csl(message)
+                    if csl.get("DOI"):
+                        out[str(csl["DOI"]).lower()] = csl
+        return out
+
     def save_csl(self, doi: str, data: Dict[str, Any]) -> Path:
         filename = _safe_filename_from_doi(doi) + ".json"
         path = self.citations_dir / filename
@@ -157,7 +262,7 @@ class DoiBibliographyClient:
                 year = parts[0][0]
         except Exception:
             pass
-        key = re.sub(r"[^A-Za-z0-9]+", "", (title or "untitled").lower())[:30]
+        key = _NON_ALNUM_RUN_RE.sub("", (title or "untitled").lower())[:30]
         if year:
             return f"{key}{year}"
         return key or "key"